@@ -1,21 +1,25 @@
 """Flask application initialization and configuration."""
 
+import atexit
 import logging
-from flask import Flask
-from flask_cors import CORS
+from datetime import datetime
+from flask import Flask, Response, request
+from werkzeug.exceptions import HTTPException
 
 from app.config import config
-from app.services import (
-    get_cache_service,
-    CoinGeckoService,
-    FibonacciService,
-    ScannerService
-)
-from app.api import api_bp
 
 
 def setup_logging():
-    """Configure application logging."""
+    """
+    Configure application logging.
+    
+    Project convention: pass log arguments %-style, e.g.
+    ``logger.debug("Cache HIT: %s", key)``, rather than pre-formatting
+    them with f-strings. The logging module then skips formatting
+    entirely for records below the configured level. Where computing the
+    arguments themselves is not free, guard the call with
+    ``logger.isEnabledFor(level)``.
+    """
     log_level = getattr(logging, config.LOG_LEVEL.upper(), logging.INFO)
     
     logging.basicConfig(
@@ -25,8 +29,9 @@ def setup_logging():
     )
     
     # Reduce noise from third-party libraries
-    logging.getLogger('urllib3').setLevel(logging.WARNING)
-    logging.getLogger('requests').setLevel(logging.WARNING)
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    logging.getLogger('httpcore').setLevel(logging.WARNING)
+    logging.getLogger('hpack').setLevel(logging.WARNING)
 
 
 def create_app():
@@ -36,6 +41,21 @@ def create_app():
     Returns:
         Configured Flask application
     """
+    # Services and routes are imported here rather than at module level so
+    # that importing a lone submodule (e.g. app.services.cache_service) does
+    # not load the HTTP client, Pydantic models and every blueprint
+    from flask_cors import CORS
+    from app.api import api_bp, APIError
+    from app.extensions import cache, cache_config
+    from app.models import ATHATLData
+    from app.services import (
+        get_cache_service,
+        CoinGeckoService,
+        FibonacciService,
+        ScannerService
+    )
+    from app.utils import ORJSONProvider, dumps, json_response
+    
     # Setup logging
     setup_logging()
     logger = logging.getLogger(__name__)
@@ -43,6 +63,8 @@ def create_app():
     # Create Flask app
     app = Flask(__name__)
     app.config.from_object(config)
+    # jsonify and request.get_json use the same orjson encoder as the routes
+    app.json = ORJSONProvider(app)
     
     # Enable CORS
     CORS(app, resources={
@@ -53,16 +75,44 @@ def create_app():
         }
     })
     
+    # Route-level response cache for idempotent GET endpoints
+    cache.init_app(app, config=cache_config(
+        default_timeout=config.CACHE_TTL,
+        max_size=config.CACHE_MAX_SIZE,
+        redis_url=config.REDIS_URL
+    ))
+    
     logger.info("Initializing services...")
     
     # Initialize services
     cache_service = get_cache_service(
         ttl=config.CACHE_TTL,
-        max_size=config.CACHE_MAX_SIZE
+        max_size=config.CACHE_MAX_SIZE,
+        redis_url=config.REDIS_URL
     )
     
+    # The HTTP client is process-wide and closes itself at exit
     coingecko_service = CoinGeckoService(cache_service=cache_service)
+    if config.ATH_ATL_REFRESH_INTERVAL > 0:
+        # Started by each serving process on its first request: with
+        # gunicorn --preload the app is built in the master, which serves
+        # nothing and whose threads would not survive the fork anyway
+        @app.before_request
+        def start_ath_atl_refresh():
+            """Start this process's ATH/ATL refresher if not yet running."""
+            # Test clients never poll CoinGecko in the background
+            if not app.testing:
+                coingecko_service.start_background_refresh(
+                    interval=config.ATH_ATL_REFRESH_INTERVAL
+                )
+        
+        atexit.register(coingecko_service.stop_background_refresh)
     fibonacci_service = FibonacciService()
+    # One analysis at boot warms the Fibonacci kernel (compiling it when
+    # numba is installed) and the model validators before the first request
+    fibonacci_service.analyze(
+        'WARM', ATHATLData(ath=2.0, atl=1.0, current_price=1.5)
+    )
     
     scanner_service = ScannerService(
         coingecko_service=coingecko_service,
@@ -70,33 +120,89 @@ def create_app():
         cache_service=cache_service
     )
     
-    # Store services in app context for access in routes
-    app.cache_service = cache_service
-    app.coingecko_service = coingecko_service
-    app.fibonacci_service = fibonacci_service
-    app.scanner_service = scanner_service
+    # Register services as app extensions for access in routes
+    app.extensions['cache_service'] = cache_service
+    app.extensions['coingecko_service'] = coingecko_service
+    app.extensions['fibonacci_service'] = fibonacci_service
+    app.extensions['scanner_service'] = scanner_service
     
     # Register blueprints
     app.register_blueprint(api_bp)
     
+    # The generic 500 body never changes apart from its timestamp, so the
+    # static prefix is serialized once here instead of on every failure
+    internal_error_prefix = dumps({
+        'error': 'Internal server error',
+        'status_code': 500
+    })[:-1] + b',"timestamp":'
+    
+    @app.after_request
+    def revalidate(response):
+        """Answer If-None-Match for responses replayed from the route cache."""
+        if response.status_code == 200 and 'ETag' in response.headers:
+            response.make_conditional(request)
+        return response
+    
+    def error_response(message, status_code):
+        """Build the standard JSON error body."""
+        logger.warning("%s %s - %s", request.method, request.path, message)
+        return json_response({
+            'error': message,
+            'status_code': status_code,
+            'timestamp': datetime.utcnow()
+        }, status=status_code)
+    
+    @app.errorhandler(APIError)
+    def handle_api_error(e):
+        """Return the standard error body for typed API errors."""
+        return error_response(e.message, e.status_code)
+    
+    @app.errorhandler(HTTPException)
+    def handle_http_error(e):
+        """Render Werkzeug errors (404, 405, malformed JSON) as JSON too."""
+        # Redirects such as strict-slash 308s are not errors
+        if e.code is None or e.code < 400:
+            return e
+        
+        response = error_response(e.description, e.code)
+        # Keep protocol headers such as Allow on 405s
+        for name, value in e.get_headers():
+            if name.lower() != 'content-type':
+                response.headers[name] = value
+        return response
+    
+    @app.errorhandler(Exception)
+    def handle_unexpected_error(e):
+        """Return a generic 500 for uncaught exceptions."""
+        logger.error(
+            "Unhandled error on %s %s: %s", request.method, request.path, e,
+            exc_info=True
+        )
+        body = internal_error_prefix + dumps(datetime.utcnow()) + b'}'
+        return Response(body, status=500, mimetype='application/json')
+    
     logger.info("Application initialized successfully")
     
+    # The index body is static, so it is encoded once per app instead of
+    # on every hit from health probes and load balancers
+    index_body = dumps({
+        'name': 'Trade-Scan API',
+        'version': '1.0.0',
+        'description': 'Professional cryptocurrency analysis with Fibonacci levels',
+        'endpoints': {
+            'health': '/api/v1/health',
+            'coins': '/api/v1/coins',
+            'coin_detail': '/api/v1/coins/{symbol}',
+            'fibonacci': '/api/v1/coins/{symbol}/fibonacci',
+            'ath_atl': '/api/v1/coins/{symbol}/ath-atl',
+            'scan': '/api/v1/scan'
+        }
+    })
+    
     # Root endpoint
     @app.route('/')
     def index():
         """Root endpoint with API information."""
-        return {
-            'name': 'Trade-Scan API',
-            'version': '1.0.0',
-            'description': 'Professional cryptocurrency analysis with Fibonacci levels',
-            'endpoints': {
-                'health': '/api/v1/health',
-                'coins': '/api/v1/coins',
-                'coin_detail': '/api/v1/coins/{symbol}',
-                'fibonacci': '/api/v1/coins/{symbol}/fibonacci',
-                'ath_atl': '/api/v1/coins/{symbol}/ath-atl',
-                'scan': '/api/v1/scan'
-            }
-        }
+        return Response(index_body, mimetype='application/json')
     
     return app
@@ -2,10 +2,12 @@
 
 from flask import Blueprint
 
+from app.api.errors import APIError, BadRequestError, NotFoundError
+
 # Create API blueprint
 api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
 
 # Import routes to register them with the blueprint
 from app.api.routes import coins, health
 
-__all__ = ['api_bp']
+__all__ = ['api_bp', 'APIError', 'BadRequestError', 'NotFoundError']
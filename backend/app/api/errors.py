@@ -0,0 +1,57 @@
+"""
+API error types for Trade-Scan.
+
+Routes raise these exceptions instead of building error responses inline;
+the handlers registered in ``create_app`` turn them into the standard
+``ErrorResponse`` JSON format.
+"""
+
+from functools import wraps
+
+
+class APIError(Exception):
+    """Base class for errors returned to API clients."""
+    
+    status_code = 500
+    
+    def __init__(self, message: str):
+        """
+        Initialize the error.
+        
+        Args:
+            message: Human-readable error message
+        """
+        super().__init__(message)
+        self.message = message
+
+
+class BadRequestError(APIError):
+    """Raised when request parameters are invalid."""
+    
+    status_code = 400
+
+
+class NotFoundError(APIError):
+    """Raised when a requested resource does not exist."""
+    
+    status_code = 404
+
+
+def handle_errors(func):
+    """
+    Decorator translating ValueError raised by a route into BadRequestError.
+    
+    Args:
+        func: Route function
+        
+    Returns:
+        Decorated route function
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except ValueError as e:
+            raise BadRequestError(f"Invalid parameter: {str(e)}") from e
+    
+    return wrapper
@@ -1,16 +1,70 @@
 """Coin-related API endpoints."""
 
 import logging
-from flask import jsonify, request, current_app
-from datetime import datetime
+from flask import request, current_app
 
 from app.api import api_bp
-from app.models import ErrorResponse
+from app.api.errors import BadRequestError, NotFoundError, handle_errors
+from app.config import config
+from app.extensions import cache, is_cacheable
+from app.models import ATHATLData
+from app.utils import json_bytes_response, json_response
 
 logger = logging.getLogger(__name__)
 
+# Query parameters forwarded to the scanner as filters by GET /coins
+_FILTER_PARAMS = ('min_volume', 'min_market_cap', 'min_change_24h', 'max_change_24h')
 
+
+def _parse_bool(value) -> bool:
+    """
+    Coerce a JSON boolean field, accepting 'true'/'false' strings.
+    
+    Args:
+        value: Field value from the request body
+    
+    Returns:
+        Parsed boolean
+    
+    Raises:
+        BadRequestError: If the value is not a boolean
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    raise BadRequestError("include_fibonacci must be a boolean")
+
+
+def _parse_filters(filters):
+    """
+    Validate the scan filters object, normalizing values to strings.
+    
+    Args:
+        filters: Field value from the request body
+    
+    Returns:
+        Filters mapping, or None if none were given
+    
+    Raises:
+        BadRequestError: If filters is not an object of scalar values
+    """
+    if filters is None:
+        return None
+    if not isinstance(filters, dict):
+        raise BadRequestError("filters must be a JSON object")
+    
+    parsed = {}
+    for key, value in filters.items():
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise BadRequestError(f"Filter '{key}' must be a number or string")
+        parsed[key] = str(value)
+    return parsed
+
+
+# Not route-cached: scan_top_coins_json already caches the encoded body
 @api_bp.route('/coins', methods=['GET'])
+@handle_errors
 def get_coins():
     """
     Get top coins by market cap.
@@ -18,217 +72,157 @@ def get_coins():
     Query Parameters:
         limit (int): Number of coins to return (default: 100, max: 250)
         include_fibonacci (bool): Include Fibonacci analysis (default: false)
-        
+    
     Returns:
         JSON list of coins with market data
     """
-    try:
-        # Parse query parameters
-        limit = min(int(request.args.get('limit', 100)), 250)
-        include_fibonacci = request.args.get('include_fibonacci', 'false').lower() == 'true'
-        
-        # Get filters
-        filters = {}
-        if 'min_volume' in request.args:
-            filters['min_volume'] = request.args.get('min_volume')
-        if 'min_market_cap' in request.args:
-            filters['min_market_cap'] = request.args.get('min_market_cap')
-        if 'min_change_24h' in request.args:
-            filters['min_change_24h'] = request.args.get('min_change_24h')
-        if 'max_change_24h' in request.args:
-            filters['max_change_24h'] = request.args.get('max_change_24h')
-        
-        logger.info(
-            f"GET /coins - limit={limit}, fibonacci={include_fibonacci}, "
-            f"filters={filters}"
-        )
-        
-        # Get scanner service from app context
-        scanner_service = current_app.scanner_service
-        
-        # Scan top coins
-        result = scanner_service.scan_top_coins(
-            limit=limit,
-            include_fibonacci=include_fibonacci,
-            filters=filters if filters else None
-        )
-        
-        # Convert to dict for JSON serialization
-        response = {
-            'total_coins': result.total_coins,
-            'coins': [coin.model_dump() for coin in result.coins],
-            'timestamp': result.timestamp.isoformat(),
-            'filters_applied': result.filters_applied
-        }
-        
-        return jsonify(response), 200
-        
-    except ValueError as e:
-        logger.warning(f"Invalid parameter: {e}")
-        error = ErrorResponse(
-            error=f"Invalid parameter: {str(e)}",
-            status_code=400
-        )
-        return jsonify(error.model_dump()), 400
-        
-    except Exception as e:
-        logger.error(f"Error fetching coins: {e}", exc_info=True)
-        error = ErrorResponse(
-            error="Internal server error",
-            status_code=500
-        )
-        return jsonify(error.model_dump()), 500
+    # Resolve request proxies once and work on locals from here on
+    args = request.args
+    get_arg = args.get
+    scanner_service = current_app.extensions['scanner_service']
+    
+    # Parse query parameters
+    limit = min(int(get_arg('limit', 100)), 250)
+    include_fibonacci = get_arg('include_fibonacci', 'false').lower() == 'true'
+    filters = {key: args[key] for key in _FILTER_PARAMS if key in args}
+    
+    logger.info(
+        "GET /coins - limit=%s, fibonacci=%s, filters=%s",
+        limit, include_fibonacci, filters
+    )
+    
+    # Scan top coins (encoded payload is served from cache when warm)
+    body = scanner_service.scan_top_coins_json(
+        limit=limit,
+        include_fibonacci=include_fibonacci,
+        filters=filters if filters else None
+    )
+    
+    return json_bytes_response(body, conditional=True)
 
 
 @api_bp.route('/coins/<symbol>', methods=['GET'])
+@cache.cached(
+    timeout=config.MARKET_DATA_TTL,
+    query_string=True,
+    response_filter=is_cacheable
+)
 def get_coin_by_symbol(symbol: str):
     """
     Get coin data by symbol.
     
     Path Parameters:
         symbol (str): Coin symbol (e.g., 'BTC', 'ETH')
-        
+    
     Query Parameters:
         include_fibonacci (bool): Include Fibonacci analysis (default: true)
-        
+    
     Returns:
         JSON with coin market data and analysis
     """
-    try:
-        include_fibonacci = request.args.get('include_fibonacci', 'true').lower() == 'true'
-        
-        logger.info(f"GET /coins/{symbol} - fibonacci={include_fibonacci}")
-        
-        # Get scanner service from app context
-        scanner_service = current_app.scanner_service
-        
-        # Get coin data
-        coin_data = scanner_service.get_coin_by_symbol(
-            symbol=symbol.upper(),
-            include_fibonacci=include_fibonacci
-        )
-        
-        if not coin_data:
-            error = ErrorResponse(
-                error=f"Coin with symbol '{symbol.upper()}' not found",
-                status_code=404
-            )
-            return jsonify(error.model_dump()), 404
-        
-        return jsonify(coin_data.model_dump()), 200
-        
-    except Exception as e:
-        logger.error(f"Error fetching coin {symbol}: {e}", exc_info=True)
-        error = ErrorResponse(
-            error="Internal server error",
-            status_code=500
-        )
-        return jsonify(error.model_dump()), 500
+    include_fibonacci = request.args.get('include_fibonacci', 'true').lower() == 'true'
+    
+    logger.info("GET /coins/%s - fibonacci=%s", symbol, include_fibonacci)
+    
+    # Get scanner service from the app extensions
+    scanner_service = current_app.extensions['scanner_service']
+    
+    # Get coin data
+    coin_data = scanner_service.get_coin_by_symbol(
+        symbol=symbol.upper(),
+        include_fibonacci=include_fibonacci
+    )
+    
+    if not coin_data:
+        raise NotFoundError(f"Coin with symbol '{symbol.upper()}' not found")
+    
+    return json_response(coin_data, conditional=True)
 
 
 @api_bp.route('/coins/<symbol>/fibonacci', methods=['GET'])
+@cache.cached(
+    timeout=config.MARKET_DATA_TTL,
+    query_string=True,
+    response_filter=is_cacheable
+)
 def get_fibonacci_analysis(symbol: str):
     """
     Get Fibonacci analysis for a coin.
     
     Path Parameters:
         symbol (str): Coin symbol (e.g., 'BTC', 'ETH')
-        
+    
     Returns:
         JSON with Fibonacci retracement and extension levels
     """
-    try:
-        logger.info(f"GET /coins/{symbol}/fibonacci")
-        
-        # Get scanner service from app context
-        scanner_service = current_app.scanner_service
-        
-        # Get coin data with Fibonacci analysis
-        coin_data = scanner_service.get_coin_by_symbol(
-            symbol=symbol.upper(),
-            include_fibonacci=True
-        )
-        
-        if not coin_data:
-            error = ErrorResponse(
-                error=f"Coin with symbol '{symbol.upper()}' not found",
-                status_code=404
-            )
-            return jsonify(error.model_dump()), 404
-        
-        if not coin_data.fibonacci_analysis:
-            error = ErrorResponse(
-                error=f"Fibonacci analysis not available for '{symbol.upper()}'",
-                status_code=404
-            )
-            return jsonify(error.model_dump()), 404
-        
-        return jsonify(coin_data.fibonacci_analysis.model_dump()), 200
-        
-    except Exception as e:
-        logger.error(f"Error fetching Fibonacci for {symbol}: {e}", exc_info=True)
-        error = ErrorResponse(
-            error="Internal server error",
-            status_code=500
+    logger.info("GET /coins/%s/fibonacci", symbol)
+    
+    # Get scanner service from the app extensions
+    scanner_service = current_app.extensions['scanner_service']
+    
+    # Get coin data with Fibonacci analysis
+    coin_data = scanner_service.get_coin_by_symbol(
+        symbol=symbol.upper(),
+        include_fibonacci=True
+    )
+    
+    if not coin_data:
+        raise NotFoundError(f"Coin with symbol '{symbol.upper()}' not found")
+    
+    if not coin_data.fibonacci_analysis:
+        raise NotFoundError(
+            f"Fibonacci analysis not available for '{symbol.upper()}'"
         )
-        return jsonify(error.model_dump()), 500
+    
+    return json_response(coin_data.fibonacci_analysis, conditional=True)
 
 
 @api_bp.route('/coins/<symbol>/ath-atl', methods=['GET'])
+@cache.cached(
+    timeout=config.MARKET_DATA_TTL,
+    query_string=True,
+    response_filter=is_cacheable
+)
 def get_ath_atl(symbol: str):
     """
     Get ATH/ATL data for a coin.
     
     Path Parameters:
         symbol (str): Coin symbol (e.g., 'BTC', 'ETH')
-        
+    
     Returns:
         JSON with ATH and ATL values
     """
+    logger.info("GET /coins/%s/ath-atl", symbol)
+    
+    # Get CoinGecko service from the app extensions
+    coingecko_service = current_app.extensions['coingecko_service']
+    
+    # Single markets call returns ATH/ATL values and dates inline
+    market = coingecko_service.get_market_by_symbol(symbol.upper())
+    
+    if not market:
+        raise NotFoundError(f"Coin with symbol '{symbol.upper()}' not found")
+    
     try:
-        logger.info(f"GET /coins/{symbol}/ath-atl")
-        
-        # Get CoinGecko service from app context
-        coingecko_service = current_app.coingecko_service
-        
-        # First, find the coin ID
-        top_coins = coingecko_service.get_top_coins(limit=100)
-        coin_id = None
-        
-        for coin in top_coins:
-            if coin.symbol == symbol.upper():
-                coin_id = coin.id
-                break
-        
-        if not coin_id:
-            error = ErrorResponse(
-                error=f"Coin with symbol '{symbol.upper()}' not found",
-                status_code=404
-            )
-            return jsonify(error.model_dump()), 404
-        
-        # Get ATH/ATL data
-        ath_atl_data = coingecko_service.get_coin_ath_atl(coin_id)
-        
-        if not ath_atl_data:
-            error = ErrorResponse(
-                error=f"ATH/ATL data not available for '{symbol.upper()}'",
-                status_code=404
-            )
-            return jsonify(error.model_dump()), 404
-        
-        return jsonify(ath_atl_data.model_dump()), 200
-        
-    except Exception as e:
-        logger.error(f"Error fetching ATH/ATL for {symbol}: {e}", exc_info=True)
-        error = ErrorResponse(
-            error="Internal server error",
-            status_code=500
+        ath_atl_data = ATHATLData(
+            ath=market.ath,
+            ath_date=market.ath_date,
+            atl=market.atl,
+            atl_date=market.atl_date,
+            current_price=market.current_price
         )
-        return jsonify(error.model_dump()), 500
+    except ValueError as e:
+        logger.warning("Invalid ATH/ATL data for %s: %s", symbol, e)
+        raise NotFoundError(
+            f"ATH/ATL data not available for '{symbol.upper()}'"
+        ) from e
+    
+    return json_response(ath_atl_data, conditional=True)
 
 
 @api_bp.route('/scan', methods=['POST'])
+@handle_errors
 def scan():
     """
     Scan multiple coins with filters.
@@ -242,46 +236,30 @@ def scan():
                 "min_change_24h": "0"
             }
         }
-        
+    
     Returns:
         JSON with scan results
     """
-    try:
-        data = request.get_json() or {}
-        
-        limit = min(int(data.get('limit', 100)), 250)
-        include_fibonacci = data.get('include_fibonacci', False)
-        filters = data.get('filters')
-        
-        logger.info(
-            f"POST /scan - limit={limit}, fibonacci={include_fibonacci}, "
-            f"filters={filters}"
-        )
-        
-        # Get scanner service from app context
-        scanner_service = current_app.scanner_service
-        
-        # Perform scan
-        result = scanner_service.scan_top_coins(
-            limit=limit,
-            include_fibonacci=include_fibonacci,
-            filters=filters
-        )
-        
-        # Convert to dict for JSON serialization
-        response = {
-            'total_coins': result.total_coins,
-            'coins': [coin.model_dump() for coin in result.coins],
-            'timestamp': result.timestamp.isoformat(),
-            'filters_applied': result.filters_applied
-        }
-        
-        return jsonify(response), 200
-        
-    except Exception as e:
-        logger.error(f"Error performing scan: {e}", exc_info=True)
-        error = ErrorResponse(
-            error="Internal server error",
-            status_code=500
-        )
-        return jsonify(error.model_dump()), 500
+    data = request.get_json() or {}
+    if not isinstance(data, dict):
+        raise BadRequestError("Request body must be a JSON object")
+    get_field = data.get
+    scanner_service = current_app.extensions['scanner_service']
+    
+    limit = min(int(get_field('limit', 100)), 250)
+    include_fibonacci = _parse_bool(get_field('include_fibonacci', False))
+    filters = _parse_filters(get_field('filters'))
+    
+    logger.info(
+        "POST /scan - limit=%s, fibonacci=%s, filters=%s",
+        limit, include_fibonacci, filters
+    )
+    
+    # Perform scan (encoded payload is served from cache when warm)
+    body = scanner_service.scan_top_coins_json(
+        limit=limit,
+        include_fibonacci=include_fibonacci,
+        filters=filters
+    )
+    
+    return json_bytes_response(body, conditional=True)
@@ -1,13 +1,17 @@
 """Health check endpoints."""
 
 import logging
-from flask import jsonify, current_app
+from flask import Response, jsonify, current_app
 from datetime import datetime
 
 from app.api import api_bp
+from app.utils import dumps
 
 logger = logging.getLogger(__name__)
 
+# Constant ping body, encoded once at import time
+_PONG = dumps({'message': 'pong'})
+
 
 @api_bp.route('/health', methods=['GET'])
 def health_check():
@@ -18,7 +22,7 @@ def health_check():
         JSON response with health status
     """
     try:
-        cache_service = current_app.cache_service
+        cache_service = current_app.extensions['cache_service']
         cache_stats = cache_service.get_stats() if cache_service else {}
         
         return jsonify({
@@ -29,7 +33,7 @@ def health_check():
         }), 200
         
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
+        logger.error("Health check failed: %s", e)
         return jsonify({
             'status': 'unhealthy',
             'error': str(e),
@@ -45,4 +49,4 @@ def ping():
     Returns:
         Pong response
     """
-    return jsonify({'message': 'pong'}), 200
+    return Response(_PONG, mimetype='application/json')
@@ -23,6 +23,7 @@ class Config:
     # Server Configuration
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "5000"))
+    SERVER_THREADS: int = int(os.getenv("SERVER_THREADS", "8"))  # waitress threads when not debugging
     
     # API Configuration
     COINGECKO_API_URL: str = os.getenv(
@@ -36,7 +37,14 @@ class Config:
     
     # Cache Configuration
     CACHE_TTL: int = int(os.getenv("CACHE_TTL", "300"))  # 5 minutes
+    # Lifetime of price-bearing data at every layer (market data, encoded
+    # scans, route cache, Cache-Control), bounding how stale a price can be
+    MARKET_DATA_TTL: int = int(os.getenv("MARKET_DATA_TTL", "30"))
     CACHE_MAX_SIZE: int = int(os.getenv("CACHE_MAX_SIZE", "1000"))
+    REDIS_URL: Optional[str] = os.getenv("REDIS_URL")  # e.g. redis://localhost:6379/0
+    # Seconds between top-250 ATH/ATL prefetches; 0 (the default) disables
+    # the polling thread, and the Docker image enables it at 6 hours
+    ATH_ATL_REFRESH_INTERVAL: int = int(os.getenv("ATH_ATL_REFRESH_INTERVAL", "0"))
     
     # Rate Limiting
     COINGECKO_RATE_LIMIT: int = int(os.getenv("COINGECKO_RATE_LIMIT", "50"))
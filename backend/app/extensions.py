@@ -0,0 +1,43 @@
+"""
+Flask extension instances for Trade-Scan backend.
+
+Extensions are created unbound here and attached to the application in
+``create_app`` so route modules can import them without a circular import.
+"""
+
+from flask_caching import Cache
+
+# Route-level response cache (Redis when REDIS_URL is set, else in-process)
+cache = Cache()
+
+
+def cache_config(default_timeout: int, max_size: int, redis_url=None) -> dict:
+    """
+    Build the Flask-Caching configuration for the response cache.
+    
+    Args:
+        default_timeout: Default entry lifetime in seconds
+        max_size: Maximum entries for the in-process backend
+        redis_url: Redis connection URL (optional)
+    
+    Returns:
+        Flask-Caching configuration mapping
+    """
+    if redis_url:
+        return {
+            'CACHE_TYPE': 'RedisCache',
+            'CACHE_REDIS_URL': redis_url,
+            'CACHE_DEFAULT_TIMEOUT': default_timeout,
+            'CACHE_KEY_PREFIX': 'ts_'
+        }
+    
+    return {
+        'CACHE_TYPE': 'SimpleCache',
+        'CACHE_DEFAULT_TIMEOUT': default_timeout,
+        'CACHE_THRESHOLD': max_size
+    }
+
+
+def is_cacheable(response) -> bool:
+    """Only full 200 responses are stored; 304s and errors never are."""
+    return getattr(response, 'status_code', None) == 200
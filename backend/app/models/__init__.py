@@ -49,6 +49,9 @@ class ATHATLData(BaseModel):
     
     class Config:
         """Pydantic configuration."""
+        # Frozen so the 0 < atl < ath guarantee checked at construction
+        # still holds when FibonacciService.analyze reads the values
+        frozen = True
         json_schema_extra = {
             "example": {
                 "ath": 69000.0,
@@ -70,6 +73,9 @@ class FibonacciLevel(BaseModel):
     
     class Config:
         """Pydantic configuration."""
+        # Immutable (and hashable), so one instance can be safely shared by
+        # the level lists and the nearest support/resistance fields
+        frozen = True
         json_schema_extra = {
             "example": {
                 "level": 0.382,
@@ -152,7 +158,9 @@ class CoinMarketData(BaseModel):
     market_cap: Optional[float] = Field(None, description="Market capitalization")
     market_cap_rank: Optional[int] = Field(None, description="Market cap rank")
     ath: Optional[float] = Field(None, description="All-time high")
+    ath_date: Optional[datetime] = Field(None, description="ATH date")
     atl: Optional[float] = Field(None, description="All-time low")
+    atl_date: Optional[datetime] = Field(None, description="ATL date")
     fibonacci_analysis: Optional[FibonacciAnalysis] = Field(None, description="Fibonacci analysis")
     asian_range: Optional[AsianRangeData] = Field(None, description="Asian range data")
     
@@ -168,7 +176,9 @@ class CoinMarketData(BaseModel):
                 "market_cap": 850000000000.0,
                 "market_cap_rank": 1,
                 "ath": 69000.0,
+                "ath_date": "2021-11-10T00:00:00Z",
                 "atl": 67.81,
+                "atl_date": "2013-07-06T00:00:00Z",
                 "fibonacci_analysis": None,
                 "asian_range": None
             }
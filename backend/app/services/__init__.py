@@ -1,14 +1,36 @@
-"""Services package for Trade-Scan backend."""
-
-from app.services.cache_service import CacheService, get_cache_service
-from app.services.coingecko_service import CoinGeckoService
-from app.services.fibonacci_service import FibonacciService
-from app.services.scanner_service import ScannerService
-
-__all__ = [
-    "CacheService",
-    "get_cache_service",
-    "CoinGeckoService",
-    "FibonacciService",
-    "ScannerService",
-]
+"""
+Services package for Trade-Scan backend.
+
+Service classes are resolved lazily (PEP 562) so importing a single
+submodule, e.g. ``app.services.cache_service``, does not pull in the HTTP
+client stack and Pydantic models used by the other services.
+"""
+
+import importlib
+
+# Public name -> defining submodule
+_EXPORTS = {
+    "CacheService": "app.services.cache_service",
+    "get_cache_service": "app.services.cache_service",
+    "CoinGeckoService": "app.services.coingecko_service",
+    "FibonacciService": "app.services.fibonacci_service",
+    "ScannerService": "app.services.scanner_service",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """Import the submodule defining ``name`` on first access."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name), name)
+    # Bind on the package so later lookups skip this hook
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
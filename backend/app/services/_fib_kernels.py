@@ -0,0 +1,115 @@
+"""
+Numeric kernels for Fibonacci analysis.
+
+``make_fib_all`` builds a function that computes every level price and the
+range position for one symbol in a single call, specialized for a fixed
+set of ratios. When numba is installed it wraps a kernel compiled with
+``@njit(cache=True)``; otherwise it generates Python source with every
+ratio inlined as a constant, removing the loops and argument unpacking
+altogether.
+"""
+
+from typing import Callable, List, Sequence
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional dependency
+    njit = None
+
+NUMBA_AVAILABLE = njit is not None
+
+# Layout of the fib_all result
+RETRACEMENT_SLICE = slice(0, 7)
+EXTENSION_SLICE = slice(7, 11)
+POSITION_INDEX = 11
+
+FibAll = Callable[[float, float, float], List[float]]
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _fib_all_jit(ath, atl, current, ret_ratios, ret_weights, ext_offsets):
+        n_ret = ret_ratios.shape[0]
+        n_ext = ext_offsets.shape[0]
+        out = np.empty(n_ret + n_ext + 1, dtype=np.float64)
+        price_range = ath - atl
+        for i in range(n_ret):
+            out[i] = ath * ret_weights[i] + atl * ret_ratios[i]
+        for i in range(n_ext):
+            out[n_ret + i] = ath + price_range * ext_offsets[i]
+        out[n_ret + n_ext] = max(0.0, min(100.0, (current - atl) / price_range * 100.0))
+        return out
+
+
+def make_fib_all(
+    ret_ratios: Sequence[float],
+    ret_weights: Sequence[float],
+    ext_offsets: Sequence[float]
+) -> FibAll:
+    """
+    Build fib_all specialized for fixed ratio constants.
+    
+    The returned function takes already validated inputs (0 < atl < ath).
+    Prices use the same arithmetic as FibonacciService.analyze_batch, and
+    no fastmath, so results are identical on either path. The position is
+    clamped to 0-100 but left unrounded.
+    
+    Args:
+        ret_ratios: Retracement ratios
+        ret_weights: Matching ATH weights, 1 - ratio
+        ext_offsets: Extension offsets, ratio - 1
+    
+    Returns:
+        Function of (ath, atl, current) returning floats laid out as
+        RETRACEMENT_SLICE, EXTENSION_SLICE and POSITION_INDEX
+    """
+    if NUMBA_AVAILABLE:
+        return _make_fib_all_jit(ret_ratios, ret_weights, ext_offsets)
+    return _make_fib_all_codegen(ret_ratios, ret_weights, ext_offsets)
+
+
+def _make_fib_all_jit(
+    ret_ratios: Sequence[float],
+    ret_weights: Sequence[float],
+    ext_offsets: Sequence[float]
+) -> FibAll:
+    """Bind the ratio constants to the numba kernel (numba required)."""
+    terms = tuple(
+        np.ascontiguousarray(t, dtype=np.float64)
+        for t in (ret_ratios, ret_weights, ext_offsets)
+    )
+    
+    def fib_all_fixed(ath: float, atl: float, current: float) -> List[float]:
+        return _fib_all_jit(ath, atl, current, *terms).tolist()
+    
+    return fib_all_fixed
+
+
+def _make_fib_all_codegen(
+    ret_ratios: Sequence[float],
+    ret_weights: Sequence[float],
+    ext_offsets: Sequence[float]
+) -> FibAll:
+    """Generate fib_all as Python source with the ratios inlined."""
+    # repr() round-trips floats exactly, so the inlined constants compute
+    # the same results as the JIT kernel; the clamp is spelled out to avoid two
+    # builtin calls and maps -0.0 to 0.0 just like max(0.0, ...)
+    prices = [
+        f"ath * {float(w)!r} + atl * {float(r)!r}"
+        for r, w in zip(ret_ratios, ret_weights)
+    ]
+    prices += [f"ath + price_range * {float(o)!r}" for o in ext_offsets]
+    source = (
+        "def fib_all_fixed(ath, atl, current):\n"
+        "    price_range = ath - atl\n"
+        "    position = (current - atl) / price_range * 100.0\n"
+        "    return [\n"
+        + "".join(f"        {price},\n" for price in prices)
+        + "        0.0 if position <= 0.0 else 100.0 if position > 100.0 else position,\n"
+        "    ]\n"
+    )
+    namespace: dict = {}
+    exec(compile(source, "<fib_all_fixed>", "exec"), namespace)
+    return namespace["fib_all_fixed"]
@@ -1,45 +1,200 @@
 """
 Cache service for Trade-Scan application.
 
-This module provides in-memory caching with TTL (Time To Live) support
-to reduce API calls and improve performance.
+This module provides caching with TTL (Time To Live) support to reduce
+API calls and improve performance. Values are stored in Redis when a
+``REDIS_URL`` is configured, so that all worker processes share a single
+cache; otherwise an in-process LRU cache is used.
+
+Every entry carries its own TTL. Once that passes the entry is no longer
+returned by ``get`` but is retained for a further ``stale_ttl`` seconds, so
+callers can fall back to it via ``get_with_stale`` when a refresh fails.
 """
 
+import pickle
 import time
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Callable, Dict, Tuple
 from functools import wraps
-from cachetools import TTLCache
+from hashlib import blake2b
 import logging
+import orjson
+
+try:
+    # C-extension LRU dict: the cheapest get/set of the supported stores,
+    # and the only one requirements.txt installs. The others are accepted
+    # as drop-in fallbacks where lru-dict is unavailable
+    from lru import LRU as LRUCache
+except ImportError:  # pragma: no cover - optional dependency
+    try:
+        # Rust-backed, signature-compatible LRUCache
+        from cachebox import LRUCache
+    except ImportError:
+        from cachetools import LRUCache
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
 
 logger = logging.getLogger(__name__)
 
 
 class CacheService:
     """
-    In-memory cache service with TTL support.
+    Cache service with TTL support.
     
     This service provides caching functionality to reduce redundant API calls
-    and improve application performance. It uses TTLCache for automatic expiration.
+    and improve application performance. When a Redis URL is given, values are
+    pickled into Redis so every worker process shares hits; otherwise it falls
+    back to an in-process LRU cache.
+    
+    Entries are stored as ``(fresh_until, value)`` pairs. Redis entries use
+    wall-clock seconds, so expiry is consistent across processes sharing
+    them; in-memory entries use integer ``time.monotonic_ns`` deadlines,
+    which are immune to NTP adjustments and compare as plain ints.
     """
     
-    def __init__(self, ttl: int = 300, max_size: int = 1000):
+    # Versioned so entries written in an older layout are never unpickled
+    KEY_PREFIX = "trade-scan:v2:"
+    
+    # In-memory operations between sweeps for entries past the stale window
+    SWEEP_EVERY = 1024
+    
+    def __init__(
+        self,
+        ttl: int = 300,
+        max_size: int = 1000,
+        redis_url: Optional[str] = None,
+        stale_ttl: int = 3600
+    ):
         """
         Initialize the cache service.
         
         Args:
-            ttl: Time to live in seconds (default: 300 = 5 minutes)
+            ttl: Default time to live in seconds (default: 300 = 5 minutes)
             max_size: Maximum number of items in cache (default: 1000)
+            redis_url: Redis connection URL (optional, in-memory if None)
+            stale_ttl: Seconds an expired entry remains available to
+                get_with_stale (default: 3600)
         """
         self.ttl = ttl
         self.max_size = max_size
-        self._cache: TTLCache = TTLCache(maxsize=max_size, ttl=ttl)
+        self.stale_ttl = stale_ttl
+        self._client = None
+        self._cache: Optional[LRUCache] = None
         self._stats = {
             "hits": 0,
+            "stale_hits": 0,
             "misses": 0,
             "sets": 0,
             "deletes": 0
         }
-        logger.info(f"CacheService initialized with TTL={ttl}s, max_size={max_size}")
+        
+        if redis_url and redis is not None:
+            pool = redis.ConnectionPool.from_url(redis_url, max_connections=50)
+            self._client = redis.Redis(connection_pool=pool)
+            backend = "redis"
+        else:
+            if redis_url:
+                logger.warning(
+                    "REDIS_URL is set but redis-py is not installed; "
+                    "falling back to in-memory cache"
+                )
+            self._cache = LRUCache(max_size)
+            backend = "memory"
+        
+        self.backend = backend
+        
+        # Clock and units for entry deadlines (see class docstring)
+        if self._client is not None:
+            self._now = time.time
+            self._ticks_per_second = 1
+        else:
+            self._now = time.monotonic_ns
+            self._ticks_per_second = 1_000_000_000
+        self._stale_ticks = stale_ttl * self._ticks_per_second
+        self._ops = 0
+        
+        logger.info(
+            "CacheService initialized with backend=%s, TTL=%ss, max_size=%s",
+            backend, ttl, max_size
+        )
+    
+    def _redis_key(self, key: str) -> str:
+        """Namespace a cache key for the shared Redis keyspace."""
+        return f"{self.KEY_PREFIX}{key}"
+    
+    def _load(self, key: str) -> Optional[Tuple[float, Any]]:
+        """
+        Load a retained entry, fresh or stale.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Tuple of (fresh_until, value), or None if nothing is retained
+        """
+        if self._client is not None:
+            try:
+                blob = self._client.get(self._redis_key(key))
+                return pickle.loads(blob) if blob is not None else None
+            except (redis.RedisError, pickle.UnpicklingError) as e:
+                logger.warning("Cache GET failed for %s: %s", key, e)
+                return None
+        
+        self._maybe_sweep()
+        try:
+            fresh_until, value = self._cache[key]
+        except KeyError:
+            return None
+        
+        # Redis drops entries past the stale window itself; do it here
+        if self._now() >= fresh_until + self._stale_ticks:
+            self._cache.pop(key, None)
+            return None
+        return fresh_until, value
+    
+    def _maybe_sweep(self) -> None:
+        """Count an in-memory operation, sweeping every SWEEP_EVERY of them."""
+        self._ops += 1
+        if self._ops >= self.SWEEP_EVERY:
+            self._ops = 0
+            self._sweep()
+    
+    def _sweep(self) -> int:
+        """
+        Drop in-memory entries whose stale window has passed.
+        
+        Such entries are otherwise only removed when read or evicted, so
+        keys that are never requested again would hold LRU slots that live
+        entries need.
+        
+        Returns:
+            Number of entries removed
+        """
+        cutoff = self._now() - self._stale_ticks
+        try:
+            expired = [
+                (key, entry) for key, entry in self._cache.items()
+                if entry[0] <= cutoff
+            ]
+        except RuntimeError:
+            # Resized by another thread mid-iteration; try next cycle
+            return 0
+        
+        removed = 0
+        for key, entry in expired:
+            try:
+                # Skip keys re-set since the scan above
+                if self._cache[key] is entry:
+                    del self._cache[key]
+                    removed += 1
+            except KeyError:
+                pass
+        
+        if removed:
+            logger.debug("Cache SWEEP: removed %s expired entries", removed)
+        return removed
     
     def get(self, key: str) -> Optional[Any]:
         """
@@ -47,31 +202,75 @@ class CacheService:
         
         Args:
             key: Cache key
-            
+        
         Returns:
             Cached value if exists and not expired, None otherwise
         """
-        try:
-            value = self._cache[key]
-            self._stats["hits"] += 1
-            logger.debug(f"Cache HIT: {key}")
-            return value
-        except KeyError:
+        entry = self._load(key)
+        if entry is None or self._now() >= entry[0]:
             self._stats["misses"] += 1
-            logger.debug(f"Cache MISS: {key}")
+            logger.debug("Cache MISS: %s", key)
             return None
+        
+        self._stats["hits"] += 1
+        logger.debug("Cache HIT: %s", key)
+        return entry[1]
     
-    def set(self, key: str, value: Any) -> None:
+    def get_with_stale(self, key: str) -> Tuple[Optional[Any], bool]:
+        """
+        Retrieve a value from cache, including expired entries.
+        
+        Intended as a fallback when refreshing a value fails: an entry past
+        its TTL but within the stale window is still returned, flagged stale.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Tuple of (value or None, is_stale)
+        """
+        entry = self._load(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            logger.debug("Cache MISS: %s", key)
+            return None, False
+        
+        if self._now() >= entry[0]:
+            self._stats["stale_hits"] += 1
+            logger.debug("Cache STALE HIT: %s", key)
+            return entry[1], True
+        
+        self._stats["hits"] += 1
+        logger.debug("Cache HIT: %s", key)
+        return entry[1], False
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """
         Store a value in cache.
         
         Args:
             key: Cache key
             value: Value to cache
+            ttl: Time to live in seconds (uses the service default if None)
         """
-        self._cache[key] = value
+        ttl = self.ttl if ttl is None else ttl
+        entry = (self._now() + ttl * self._ticks_per_second, value)
+        
+        if self._client is not None:
+            try:
+                blob = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+                self._client.set(
+                    self._redis_key(key), blob, ex=ttl + self.stale_ttl
+                )
+            except redis.RedisError as e:
+                logger.warning("Cache SET failed for %s: %s", key, e)
+                return
+        else:
+            self._maybe_sweep()
+            self._cache[key] = entry
+        
         self._stats["sets"] += 1
-        logger.debug(f"Cache SET: {key}")
+        logger.debug("Cache SET: %s", key)
     
     def delete(self, key: str) -> bool:
         """
@@ -79,27 +278,74 @@ class CacheService:
         
         Args:
             key: Cache key
-            
+        
         Returns:
             True if key existed and was deleted, False otherwise
         """
+        if self._client is not None:
+            try:
+                deleted = self._client.delete(self._redis_key(key)) > 0
+            except redis.RedisError as e:
+                logger.warning("Cache DELETE failed for %s: %s", key, e)
+                return False
+            
+            if deleted:
+                self._stats["deletes"] += 1
+                logger.debug("Cache DELETE: %s", key)
+            return deleted
+        
         try:
             del self._cache[key]
             self._stats["deletes"] += 1
-            logger.debug(f"Cache DELETE: {key}")
+            logger.debug("Cache DELETE: %s", key)
             return True
         except KeyError:
             return False
     
     def clear(self) -> None:
         """Clear all cached values."""
-        self._cache.clear()
+        if self._client is not None:
+            try:
+                keys = list(self._client.scan_iter(match=f"{self.KEY_PREFIX}*"))
+                if keys:
+                    self._client.delete(*keys)
+            except redis.RedisError as e:
+                logger.warning("Cache CLEAR failed: %s", e)
+                return
+        else:
+            self._cache.clear()
         logger.info("Cache cleared")
     
+    def _size(self) -> Optional[int]:
+        """
+        Get the number of cached items.
+        
+        Redis gives no constant-time count of one key prefix: DBSIZE also
+        counts the route cache and anything else sharing the database, and
+        a SCAN walks the whole keyspace. Size is therefore not reported
+        for the Redis backend.
+        
+        Returns:
+            Number of in-memory entries, or None on Redis
+        """
+        if self._client is not None:
+            return None
+        return len(self._cache)
+    
+    def _reset_stats(self) -> None:
+        """Zero the hit/miss/set/delete counters."""
+        for name in self._stats:
+            self._stats[name] = 0
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Get cache statistics.
         
+        Constant time on either backend, since the health endpoint polls it:
+        counters are maintained incrementally, the in-memory size is len()
+        of the store, and Redis contributes only INFO stats (its size is
+        reported as None, see _size).
+        
         Returns:
             Dictionary containing cache statistics
         """
@@ -110,14 +356,26 @@ class CacheService:
             else 0
         )
         
-        return {
+        stats = {
             **self._stats,
-            "size": len(self._cache),
+            "backend": self.backend,
+            "size": self._size(),
             "max_size": self.max_size,
             "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
             "hit_rate": round(hit_rate, 2),
             "total_requests": total_requests
         }
+        
+        if self._client is not None:
+            try:
+                info = self._client.info("stats")
+                stats["keyspace_hits"] = info.get("keyspace_hits", 0)
+                stats["keyspace_misses"] = info.get("keyspace_misses", 0)
+            except redis.RedisError as e:
+                logger.warning("Failed to read Redis stats: %s", e)
+        
+        return stats
     
     def has_key(self, key: str) -> bool:
         """
@@ -125,24 +383,58 @@ class CacheService:
         
         Args:
             key: Cache key
-            
+        
         Returns:
             True if key exists and is not expired, False otherwise
         """
-        return key in self._cache
+        entry = self._load(key)
+        return entry is not None and self._now() < entry[0]
+
+
+def _make_cache_key(
+    func: Callable,
+    key_prefix: str,
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any]
+) -> Tuple[str, bytes]:
+    """
+    Build a compact, stable cache key for a function call.
+    
+    Arguments are canonicalized with orjson (sorted keys, non-primitive
+    values stringified) and hashed, so equivalent calls always map to the
+    same fixed-size key regardless of kwargs order.
+    
+    Args:
+        func: Function being cached
+        key_prefix: Prefix for cache key
+        args: Positional arguments (excluding self)
+        kwargs: Keyword arguments
+    
+    Returns:
+        Tuple of (cache key, canonical payload)
+    """
+    payload = orjson.dumps(
+        (func.__module__, func.__qualname__, args, kwargs),
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        default=str
+    )
+    digest = blake2b(payload, digest_size=16).hexdigest()
+    return f"{key_prefix}:{digest}", payload
 
 
-def cached(ttl: Optional[int] = None, key_prefix: str = ""):
+def cached(ttl: Optional[int] = None, key_prefix: str = "", debug: bool = False):
     """
     Decorator to cache function results.
     
     Args:
         ttl: Time to live in seconds (uses cache default if None)
         key_prefix: Prefix for cache key
-        
+        debug: Also store the canonical key payload under "<key>:payload"
+            for cache introspection
+    
     Returns:
         Decorated function with caching
-        
+    
     Example:
         @cached(ttl=60, key_prefix="coin_data")
         def get_coin_data(symbol: str):
@@ -155,8 +447,8 @@ def cached(ttl: Optional[int] = None, key_prefix: str = ""):
             if not hasattr(self, 'cache_service'):
                 return func(self, *args, **kwargs)
             
-            # Generate cache key from function name and arguments
-            cache_key = f"{key_prefix}:{func.__name__}:{args}:{sorted(kwargs.items())}"
+            # Generate cache key from function identity and arguments
+            cache_key, payload = _make_cache_key(func, key_prefix, args, kwargs)
             
             # Try to get from cache
             cached_result = self.cache_service.get(cache_key)
@@ -165,7 +457,9 @@ def cached(ttl: Optional[int] = None, key_prefix: str = ""):
             
             # Call function and cache result
             result = func(self, *args, **kwargs)
-            self.cache_service.set(cache_key, result)
+            self.cache_service.set(cache_key, result, ttl=ttl)
+            if debug:
+                self.cache_service.set(f"{cache_key}:payload", payload, ttl=ttl)
             
             return result
         
@@ -177,18 +471,27 @@ def cached(ttl: Optional[int] = None, key_prefix: str = ""):
 _cache_service: Optional[CacheService] = None
 
 
-def get_cache_service(ttl: int = 300, max_size: int = 1000) -> CacheService:
+def get_cache_service(
+    ttl: int = 300,
+    max_size: int = 1000,
+    redis_url: Optional[str] = None
+) -> CacheService:
     """
     Get or create the global cache service instance.
     
     Args:
         ttl: Time to live in seconds (default: 300)
         max_size: Maximum cache size (default: 1000)
-        
+        redis_url: Redis connection URL (optional, in-memory if None)
+    
     Returns:
         CacheService instance
     """
     global _cache_service
     if _cache_service is None:
-        _cache_service = CacheService(ttl=ttl, max_size=max_size)
+        _cache_service = CacheService(
+            ttl=ttl,
+            max_size=max_size,
+            redis_url=redis_url
+        )
     return _cache_service
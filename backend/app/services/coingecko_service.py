@@ -5,11 +5,20 @@ This module provides integration with CoinGecko API to fetch cryptocurrency
 market data, including top coins, ATH/ATL values, and current prices.
 """
 
+import atexit
+import os
+import random
+import sys
+import threading
 import time
-import requests
-from typing import List, Optional, Dict, Any
+import weakref
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+import httpx
+import orjson
+from typing import List, Optional, Dict, Any, FrozenSet, Tuple
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 
 from app.config import config
 from app.models import CoinInfo, ATHATLData, CoinMarketData
@@ -17,9 +26,178 @@ from app.services.cache_service import CacheService
 
 logger = logging.getLogger(__name__)
 
+# Request timeout: 10s overall, 3s to establish a connection
+REQUEST_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+
+# Statuses retried with backoff, and the retry budget per request
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 0.5
+MAX_BACKOFF = 60.0
+
+# Seconds a coalesced caller waits on the leading request before fetching
+# on its own, so a leader that never finishes cannot hang its followers
+COALESCE_TIMEOUT = 30.0
+
+
+def _build_session() -> httpx.Client:
+    """
+    Build a pooled HTTP/2 client for CoinGecko requests.
+    
+    Concurrent requests are multiplexed over a few kept-alive connections,
+    so only the first request to CoinGecko pays the TLS handshake cost.
+    Failed connection attempts are retried by the transport; status-based
+    retries are handled in CoinGeckoService._make_request.
+    
+    Returns:
+        Configured httpx client
+    """
+    transport = httpx.HTTPTransport(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=20,
+            max_keepalive_connections=20,
+            keepalive_expiry=60
+        ),
+        retries=2
+    )
+    return httpx.Client(
+        transport=transport,
+        timeout=REQUEST_TIMEOUT,
+        headers={
+            "Accept": "application/json",
+            "User-Agent": "Trade-Scan/1.0"
+        }
+    )
+
+
+# Process-wide session shared by all CoinGeckoService instances, created on
+# first use so forked workers never inherit (and share) pooled connections
+_session: Optional[httpx.Client] = None
+_session_lock = threading.Lock()
+
+
+def get_shared_session() -> httpx.Client:
+    """
+    Get the process-wide CoinGecko HTTP client, creating it if needed.
+    
+    The client is closed at interpreter exit.
+    
+    Returns:
+        Shared httpx.Client
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+                atexit.register(_session.close)
+    return _session
+
+
+def _reset_shared_session() -> None:
+    """Drop a client inherited across fork without closing its sockets."""
+    global _session, _session_lock
+    _session = None
+    _session_lock = threading.Lock()
+
+
+# Live services, so the fork hook can reset their per-process state
+_services: "weakref.WeakSet[CoinGeckoService]" = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    """Reset the shared client and every service after fork."""
+    _reset_shared_session()
+    for service in list(_services):
+        service._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+# fromisoformat accepts a trailing 'Z' natively from Python 3.11
+_NATIVE_ISO_Z = sys.version_info >= (3, 11)
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse a CoinGecko ISO 8601 timestamp.
+    
+    ATH/ATL dates rarely change between refreshes, so parsed values are
+    memoized (datetimes are immutable and safe to share).
+    
+    Args:
+        value: Timestamp string (e.g., '2021-11-10T14:24:11.849Z')
+    
+    Returns:
+        Parsed datetime or None if value is empty
+    """
+    if not value:
+        return None
+    if _NATIVE_ISO_Z:
+        return datetime.fromisoformat(value)
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header into seconds to wait.
+    
+    Args:
+        value: Header value, either delta-seconds or an HTTP-date
+    
+    Returns:
+        Seconds to wait (never negative), or None if absent or unparseable
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class _SymbolBatch:
+    """Symbols collected during one batching window."""
+    
+    def __init__(self):
+        self.symbols = set()
+        self.results: Dict[str, CoinMarketData] = {}
+        self.done = threading.Event()
+
+
+class _InflightRequest:
+    """A CoinGecko request shared by concurrent identical callers."""
+    
+    def __init__(self):
+        self.result: Optional[Any] = None
+        self.done = threading.Event()
+
 
 class RateLimiter:
-    """Simple rate limiter for API calls."""
+    """
+    Thread-safe token-bucket rate limiter for API calls.
+    
+    Up to ``capacity`` calls may fire back to back; after that calls are
+    paced at the sustained per-minute rate. Capacity is kept slightly under
+    the published limit so clock skew against the server's window does not
+    tip bursts into 429s.
+    """
+    
+    # Fraction of the published per-minute limit actually used
+    HEADROOM = 0.9
+    
+    # Consecutive 429s after which all callers pause for a refill interval
+    THROTTLE_THRESHOLD = 3
     
     def __init__(self, calls_per_minute: int = 50):
         """
@@ -29,20 +207,58 @@ class RateLimiter:
             calls_per_minute: Maximum API calls per minute
         """
         self.calls_per_minute = calls_per_minute
-        self.min_interval = 60.0 / calls_per_minute
-        self.last_call_time = 0.0
+        self.capacity = max(1.0, calls_per_minute * self.HEADROOM)
+        self.rate = self.capacity / 60.0  # tokens per second
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._throttled = 0
+        self._lock = threading.Lock()
     
     def wait_if_needed(self) -> None:
         """Wait if necessary to respect rate limit."""
-        current_time = time.time()
-        time_since_last_call = current_time - self.last_call_time
+        # Take a token under the lock (going into debt if the bucket is
+        # empty), then sleep off any debt outside it
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            deficit = -self._tokens
         
-        if time_since_last_call < self.min_interval:
-            sleep_time = self.min_interval - time_since_last_call
-            logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f}s")
+        if deficit > 0:
+            sleep_time = deficit / self.rate
+            logger.debug("Rate limiting: sleeping for %.2fs", sleep_time)
             time.sleep(sleep_time)
+    
+    def record_throttle(self) -> bool:
+        """
+        Record a 429 response, tripping the breaker after repeated ones.
+        
+        Once THROTTLE_THRESHOLD consecutive 429s are seen, the bucket is
+        put a full window into debt, so every caller sharing this limiter
+        pauses for one refill interval before being paced again.
         
-        self.last_call_time = time.time()
+        Returns:
+            True if this call tripped the breaker
+        """
+        with self._lock:
+            self._throttled += 1
+            if self._throttled < self.THROTTLE_THRESHOLD:
+                return False
+            self._throttled = 0
+            self._tokens = min(self._tokens, 0.0) - self.capacity
+            return True
+    
+    def record_success(self) -> None:
+        """Reset the consecutive 429 count after a successful call."""
+        self._throttled = 0
+    
+    def _reset_after_fork(self) -> None:
+        """Replace a lock that a parent thread may have held at fork."""
+        self._lock = threading.Lock()
 
 
 class CoinGeckoService:
@@ -54,80 +270,313 @@ class CoinGeckoService:
     Features rate limiting and caching to optimize API usage.
     """
     
-    def __init__(self, cache_service: Optional[CacheService] = None):
+    # Seconds to collect concurrent symbol lookups into one markets call
+    BATCH_WINDOW = 0.01
+    
+    # Maximum ids per coins/markets request (CoinGecko's per_page cap)
+    MARKETS_PAGE_SIZE = 250
+    
+    # Cache lifetimes (seconds): prices go stale quickly, the top coins
+    # ranking slowly, and ATH/ATL at daily granularity
+    MARKET_DATA_TTL = config.MARKET_DATA_TTL
+    TOP_COINS_TTL = 600
+    ATH_ATL_TTL = 86400
+    
+    def __init__(
+        self,
+        cache_service: Optional[CacheService] = None,
+        session: Optional[httpx.Client] = None
+    ):
         """
         Initialize CoinGecko service.
         
         Args:
             cache_service: Cache service instance (optional)
+            session: HTTP client to use (defaults to the shared pooled client)
         """
         self.base_url = config.COINGECKO_API_URL
         self.cache_service = cache_service
         self.rate_limiter = RateLimiter(
             calls_per_minute=config.COINGECKO_RATE_LIMIT
         )
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Accept": "application/json",
-            "User-Agent": "Trade-Scan/1.0"
-        })
+        self._session = session
+        self._batch_lock = threading.Lock()
+        self._pending_batch: Optional[_SymbolBatch] = None
+        self._inflight_lock = threading.Lock()
+        self._inflight: Dict[Tuple[str, FrozenSet], _InflightRequest] = {}
+        self._refresh_interval: Optional[float] = None
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._refresh_stop = threading.Event()
+        self._refresh_lock = threading.Lock()
+        _services.add(self)
         logger.info("CoinGeckoService initialized")
     
+    def _reset_after_fork(self) -> None:
+        """
+        Drop per-process state inherited from the parent after fork.
+        
+        Locks may have been held, and in-flight requests or symbol batches
+        owned, by parent threads that do not exist in the child; followers
+        waiting on them would never be woken.
+        """
+        self._batch_lock = threading.Lock()
+        self._pending_batch = None
+        self._inflight_lock = threading.Lock()
+        self._inflight = {}
+        self._refresh_lock = threading.Lock()
+        self.rate_limiter._reset_after_fork()
+    
+    @property
+    def session(self) -> httpx.Client:
+        """HTTP client in use: the injected one, else the shared client."""
+        if self._session is not None:
+            return self._session
+        return get_shared_session()
+    
     def _make_request(
         self, 
         endpoint: str, 
-        params: Optional[Dict[str, Any]] = None,
-        retry_count: int = 3
+        params: Optional[Dict[str, Any]] = None
     ) -> Optional[Dict[str, Any]]:
         """
-        Make HTTP request to CoinGecko API with retry logic.
+        Make HTTP request to CoinGecko API, coalescing identical calls.
+        
+        Concurrent callers asking for the same endpoint and parameters share
+        a single in-flight request (and its retries), so a degraded upstream
+        sees one retry sequence instead of one per caller. A follower whose
+        leader has not finished within COALESCE_TIMEOUT fetches by itself.
         
         Args:
             endpoint: API endpoint (without base URL)
             params: Query parameters
-            retry_count: Number of retry attempts
-            
+        
+        Returns:
+            JSON response or None if failed
+        """
+        key = (endpoint, frozenset(params.items()) if params else frozenset())
+        
+        with self._inflight_lock:
+            inflight = self._inflight.get(key)
+            is_leader = inflight is None
+            if is_leader:
+                inflight = self._inflight[key] = _InflightRequest()
+        
+        if not is_leader:
+            if inflight.done.wait(COALESCE_TIMEOUT):
+                return inflight.result
+            logger.warning(
+                "Coalesced request to %s timed out after %.0fs, fetching directly",
+                endpoint, COALESCE_TIMEOUT
+            )
+            return self._fetch(endpoint, params)
+        
+        try:
+            inflight.result = self._fetch(endpoint, params)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            inflight.done.set()
+        
+        return inflight.result
+    
+    def _fetch(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Perform a CoinGecko GET with retry logic.
+        
+        Rate limits and server errors are retried with jittered exponential
+        backoff, honouring the Retry-After header (seconds or HTTP-date) on
+        429 responses. Repeated 429s trip the rate limiter's breaker, which
+        pauses every caller rather than letting each retry on its own.
+        
+        Args:
+            endpoint: API endpoint (without base URL)
+            params: Query parameters
+        
         Returns:
             JSON response or None if failed
         """
         url = f"{self.base_url}/{endpoint}"
         
-        for attempt in range(retry_count):
+        for attempt in range(MAX_RETRIES + 1):
+            self.rate_limiter.wait_if_needed()
+            
             try:
-                self.rate_limiter.wait_if_needed()
-                
-                response = self.session.get(url, params=params, timeout=10)
-                
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 429:  # Too Many Requests
-                    # Check for Retry-After header
-                    retry_after = response.headers.get('Retry-After', '60')
-                    try:
-                        wait_time = int(retry_after)
-                    except ValueError:
-                        wait_time = 60
-                    
-                    logger.warning(
-                        f"Rate limited by CoinGecko. "
-                        f"Waiting {wait_time}s (attempt {attempt + 1}/{retry_count})"
-                    )
-                    time.sleep(wait_time)
-                else:
-                    logger.error(
-                        f"CoinGecko API error: {response.status_code} - {response.text}"
-                    )
+                response = self.session.get(url, params=params)
+            except httpx.HTTPError as e:
+                logger.error("Request to CoinGecko failed: %s", e)
+                return None
+            
+            if response.status_code == 200:
+                self.rate_limiter.record_success()
+                # orjson decodes large numeric payloads far faster than json.
+                # A truncated or non-JSON body is a failed request like any
+                # transport error, so callers fall back to stale cache
+                try:
+                    return orjson.loads(response.content)
+                except orjson.JSONDecodeError as e:
+                    logger.error("Invalid JSON from CoinGecko: %s", e)
                     return None
-                    
-            except requests.exceptions.RequestException as e:
-                logger.error(
-                    f"Request failed (attempt {attempt + 1}/{retry_count}): {e}"
+            
+            if response.status_code == 429 and self.rate_limiter.record_throttle():
+                logger.warning(
+                    "Repeated 429s from CoinGecko, pausing requests for %.0fs",
+                    self.rate_limiter.capacity / self.rate_limiter.rate
                 )
-                if attempt < retry_count - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
+            
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                break
+            
+            # Jitter spreads retries from concurrent callers apart
+            delay = min(
+                MAX_BACKOFF,
+                BACKOFF_FACTOR * (2 ** attempt) + random.uniform(0, 1)
+            )
+            retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            
+            logger.warning(
+                "CoinGecko returned %s, retrying in %.1fs (attempt %s/%s)",
+                response.status_code, delay, attempt + 1, MAX_RETRIES
+            )
+            time.sleep(delay)
         
+        logger.error(
+            "CoinGecko API error: %s - %s", response.status_code, response.text
+        )
         return None
     
+    def warm_ath_atl_cache(self, limit: int = 250) -> int:
+        """
+        Prefetch ATH/ATL and market data for the top coins in one call.
+        
+        Each coins/markets row is written to its per-coin ath_atl: and
+        market_data: cache entries, so scans and symbol lookups for the
+        top coins are served without any CoinGecko round-trips.
+        
+        Args:
+            limit: Number of top coins to prefetch (max 250)
+        
+        Returns:
+            Number of coins whose ATH/ATL entry was hydrated
+        """
+        if not self.cache_service:
+            return 0
+        
+        params = {
+            "vs_currency": "usd",
+            "order": "market_cap_desc",
+            "per_page": min(limit, self.MARKETS_PAGE_SIZE),
+            "page": 1,
+            "sparkline": False,
+            "price_change_percentage": "24h"
+        }
+        
+        data = self._make_request("coins/markets", params)
+        
+        if not data:
+            logger.error("Failed to prefetch ATH/ATL data from CoinGecko")
+            return 0
+        
+        warmed = 0
+        for item in data:
+            try:
+                market_data = self._parse_market_row(item)
+                ath_atl = ATHATLData(
+                    ath=market_data.ath,
+                    ath_date=market_data.ath_date,
+                    atl=market_data.atl,
+                    atl_date=market_data.atl_date,
+                    current_price=market_data.current_price
+                )
+            except Exception as e:
+                logger.debug(
+                    "Skipping ATH/ATL prefetch for %s: %s", item.get('id'), e
+                )
+                continue
+            
+            coin_id = item["id"]
+            self.cache_service.set(
+                f"market_data:{coin_id}", market_data, ttl=self.MARKET_DATA_TTL
+            )
+            self.cache_service.set(
+                f"ath_atl:{coin_id}", ath_atl, ttl=self.ATH_ATL_TTL
+            )
+            warmed += 1
+        
+        logger.info("Prefetched ATH/ATL data for %s coins", warmed)
+        return warmed
+    
+    def start_background_refresh(self, interval: float) -> None:
+        """
+        Keep the ATH/ATL cache warm from a background thread.
+        
+        The cache is warmed immediately and then every ``interval`` seconds.
+        Calling this again while the refresher runs is a no-op. Threads do
+        not survive fork, so call it from the process that serves requests
+        (create_app does so on each worker's first request) rather than a
+        preloading master.
+        
+        Args:
+            interval: Seconds between refreshes
+        """
+        self._refresh_interval = interval
+        self._start_refresh_thread()
+    
+    def stop_background_refresh(self) -> None:
+        """Stop the background ATH/ATL refresher, if running."""
+        self._refresh_stop.set()
+    
+    def _start_refresh_thread(self) -> None:
+        """Start the refresher thread unless one is already running."""
+        # Locked so concurrent first requests cannot each start a thread
+        with self._refresh_lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            
+            self._refresh_stop = threading.Event()
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_loop,
+                args=(self._refresh_stop,),
+                name="ath-atl-refresh",
+                daemon=True
+            )
+            self._refresh_thread.start()
+    
+    def _refresh_loop(self, stop: threading.Event) -> None:
+        """Warm the ATH/ATL cache until ``stop`` is set."""
+        while not stop.is_set():
+            try:
+                self.warm_ath_atl_cache()
+            except Exception as e:
+                logger.error("ATH/ATL prefetch failed: %s", e)
+            stop.wait(self._refresh_interval)
+    
+    def _stale_fallback(self, cache_key: str) -> Optional[Any]:
+        """
+        Get the last cached value for a key after a failed refresh.
+        
+        Args:
+            cache_key: Cache key of the value being refreshed
+        
+        Returns:
+            Cached value (possibly past its TTL) or None
+        """
+        if not self.cache_service:
+            return None
+        
+        value, is_stale = self.cache_service.get_with_stale(cache_key)
+        if value is not None:
+            logger.warning(
+                "Serving %s %s after failed refresh",
+                'stale' if is_stale else 'cached', cache_key
+            )
+        return value
+    
     def get_top_coins(
         self, 
         limit: int = 100,
@@ -139,7 +588,7 @@ class CoinGeckoService:
         Args:
             limit: Number of top coins to fetch (default: 100)
             use_cache: Whether to use cached data (default: True)
-            
+        
         Returns:
             List of CoinInfo objects
         """
@@ -149,11 +598,11 @@ class CoinGeckoService:
         if use_cache and self.cache_service:
             cached = self.cache_service.get(cache_key)
             if cached:
-                logger.info(f"Retrieved {len(cached)} top coins from cache")
+                logger.info("Retrieved %s top coins from cache", len(cached))
                 return cached
         
         # Fetch from API
-        logger.info(f"Fetching top {limit} coins from CoinGecko...")
+        logger.info("Fetching top %s coins from CoinGecko...", limit)
         
         params = {
             "vs_currency": "usd",
@@ -167,7 +616,7 @@ class CoinGeckoService:
         
         if not data:
             logger.error("Failed to fetch top coins from CoinGecko")
-            return []
+            return self._stale_fallback(cache_key) or []
         
         coins = []
         for item in data[:limit]:
@@ -180,16 +629,47 @@ class CoinGeckoService:
                 )
                 coins.append(coin)
             except Exception as e:
-                logger.warning(f"Failed to parse coin data: {e}")
+                logger.warning("Failed to parse coin data: %s", e)
                 continue
         
-        # Cache the result
+        # Cache the result; the symbol map derived from the previous list
+        # lives under the same prefix and is rebuilt on next use
         if self.cache_service:
-            self.cache_service.set(cache_key, coins)
+            self.cache_service.set(cache_key, coins, ttl=self.TOP_COINS_TTL)
+            self.cache_service.delete(f"{cache_key}:symbols")
         
-        logger.info(f"Successfully fetched {len(coins)} top coins")
+        logger.info("Successfully fetched %s top coins", len(coins))
         return coins
     
+    def get_symbol_to_id_map(self, limit: int = 250) -> Dict[str, str]:
+        """
+        Get a symbol -> CoinGecko ID map for the top coins.
+        
+        When several top coins share a symbol, the highest-ranked one wins.
+        The map is cached alongside the top coins list it was built from.
+        
+        Args:
+            limit: Number of top coins to include (default: 250)
+        
+        Returns:
+            Mapping of upper-case symbol to coin ID
+        """
+        cache_key = f"top_coins:{limit}:symbols"
+        
+        if self.cache_service:
+            cached = self.cache_service.get(cache_key)
+            if cached:
+                return cached
+        
+        symbol_map: Dict[str, str] = {}
+        for coin in self.get_top_coins(limit=limit):
+            symbol_map.setdefault(coin.symbol, coin.id)
+        
+        if self.cache_service and symbol_map:
+            self.cache_service.set(cache_key, symbol_map, ttl=self.TOP_COINS_TTL)
+        
+        return symbol_map
+    
     def get_coin_ath_atl(
         self, 
         coin_id: str,
@@ -201,7 +681,7 @@ class CoinGeckoService:
         Args:
             coin_id: CoinGecko coin ID
             use_cache: Whether to use cached data (default: True)
-            
+        
         Returns:
             ATHATLData object or None if failed
         """
@@ -211,11 +691,11 @@ class CoinGeckoService:
         if use_cache and self.cache_service:
             cached = self.cache_service.get(cache_key)
             if cached:
-                logger.debug(f"Retrieved ATH/ATL for {coin_id} from cache")
+                logger.debug("Retrieved ATH/ATL for %s from cache", coin_id)
                 return cached
         
         # Fetch from API
-        logger.debug(f"Fetching ATH/ATL data for {coin_id}...")
+        logger.debug("Fetching ATH/ATL data for %s...", coin_id)
         
         params = {
             "localization": False,
@@ -228,35 +708,32 @@ class CoinGeckoService:
         data = self._make_request(f"coins/{coin_id}", params)
         
         if not data or "market_data" not in data:
-            logger.error(f"Failed to fetch ATH/ATL data for {coin_id}")
-            return None
+            logger.error("Failed to fetch ATH/ATL data for %s", coin_id)
+            return self._stale_fallback(cache_key)
         
         try:
             market_data = data["market_data"]
             
             ath_atl = ATHATLData(
                 ath=market_data["ath"]["usd"],
-                ath_date=datetime.fromisoformat(
-                    market_data["ath_date"]["usd"].replace("Z", "+00:00")
-                ) if market_data.get("ath_date", {}).get("usd") else None,
+                ath_date=_parse_date(market_data.get("ath_date", {}).get("usd")),
                 atl=market_data["atl"]["usd"],
-                atl_date=datetime.fromisoformat(
-                    market_data["atl_date"]["usd"].replace("Z", "+00:00")
-                ) if market_data.get("atl_date", {}).get("usd") else None,
+                atl_date=_parse_date(market_data.get("atl_date", {}).get("usd")),
                 current_price=market_data["current_price"]["usd"]
             )
             
             # Cache the result
             if self.cache_service:
-                self.cache_service.set(cache_key, ath_atl)
+                self.cache_service.set(cache_key, ath_atl, ttl=self.ATH_ATL_TTL)
             
             logger.debug(
-                f"ATH/ATL for {coin_id}: ATH=${ath_atl.ath}, ATL=${ath_atl.atl}"
+                "ATH/ATL for %s: ATH=$%s, ATL=$%s",
+                coin_id, ath_atl.ath, ath_atl.atl
             )
             return ath_atl
-            
+        
         except Exception as e:
-            logger.error(f"Failed to parse ATH/ATL data for {coin_id}: {e}")
+            logger.error("Failed to parse ATH/ATL data for %s: %s", coin_id, e)
             return None
     
     def get_coin_market_data(
@@ -267,56 +744,233 @@ class CoinGeckoService:
         """
         Get complete market data for a coin.
         
+        Served through get_markets_bulk, so it shares the per-coin cache
+        entries and stale fallback with bulk scans.
+        
         Args:
             coin_id: CoinGecko coin ID
             use_cache: Whether to use cached data (default: True)
-            
+        
         Returns:
             CoinMarketData object or None if failed
         """
-        cache_key = f"market_data:{coin_id}"
+        return self.get_markets_bulk([coin_id], use_cache=use_cache).get(coin_id)
+    
+    def get_markets_bulk(
+        self,
+        coin_ids: List[str],
+        use_cache: bool = True
+    ) -> Dict[str, CoinMarketData]:
+        """
+        Get market data for many coins with batched coins/markets calls.
         
-        # Try cache first
-        if use_cache and self.cache_service:
-            cached = self.cache_service.get(cache_key)
+        Coins already cached under their per-coin market data key are served
+        from cache; the rest are requested MARKETS_PAGE_SIZE ids at a time.
+        Each row carries ATH/ATL values and dates, so no coins/{id} detail
+        request is needed for Fibonacci input.
+        
+        Args:
+            coin_ids: CoinGecko coin IDs
+            use_cache: Whether to use cached data (default: True)
+        
+        Returns:
+            Mapping of coin ID to CoinMarketData (missing coins are omitted)
+        """
+        markets: Dict[str, CoinMarketData] = {}
+        missing = []
+        
+        for coin_id in dict.fromkeys(coin_ids):
+            cached = (
+                self.cache_service.get(f"market_data:{coin_id}")
+                if use_cache and self.cache_service else None
+            )
             if cached:
-                logger.debug(f"Retrieved market data for {coin_id} from cache")
-                return cached
+                markets[coin_id] = cached
+            else:
+                missing.append(coin_id)
         
-        # Fetch from API
-        params = {
-            "ids": coin_id,
-            "vs_currency": "usd",
-            "order": "market_cap_desc",
-            "sparkline": False
-        }
+        for start in range(0, len(missing), self.MARKETS_PAGE_SIZE):
+            chunk = missing[start:start + self.MARKETS_PAGE_SIZE]
+            params = {
+                "vs_currency": "usd",
+                "ids": ",".join(chunk),
+                "order": "market_cap_desc",
+                "per_page": len(chunk),
+                "page": 1,
+                "sparkline": False,
+                "price_change_percentage": "24h"
+            }
+            
+            data = self._make_request("coins/markets", params)
+            
+            if not data:
+                logger.error("Failed to fetch markets for %s coins", len(chunk))
+                for coin_id in chunk:
+                    stale = self._stale_fallback(f"market_data:{coin_id}")
+                    if stale:
+                        markets[coin_id] = stale
+                continue
+            
+            for item in data:
+                try:
+                    market_data = self._parse_market_row(item)
+                except Exception as e:
+                    logger.warning("Failed to parse market data: %s", e)
+                    continue
+                
+                markets[item["id"]] = market_data
+                if self.cache_service:
+                    self.cache_service.set(
+                        f"market_data:{item['id']}",
+                        market_data,
+                        ttl=self.MARKET_DATA_TTL
+                    )
         
-        data = self._make_request("coins/markets", params)
+        logger.debug(
+            "Bulk markets: %s/%s coins (%s fetched)",
+            len(markets), len(coin_ids), len(missing)
+        )
+        return markets
+    
+    def _parse_market_row(self, item: Dict[str, Any]) -> CoinMarketData:
+        """
+        Parse a single row of a coins/markets response.
         
-        if not data or len(data) == 0:
-            logger.error(f"Failed to fetch market data for {coin_id}")
-            return None
+        Args:
+            item: Market row from CoinGecko
         
-        try:
-            item = data[0]
-            market_data = CoinMarketData(
-                symbol=item["symbol"].upper(),
-                name=item["name"],
-                current_price=item["current_price"],
-                price_change_24h=item.get("price_change_percentage_24h", 0),
-                volume_24h=item.get("total_volume"),
-                market_cap=item.get("market_cap"),
-                market_cap_rank=item.get("market_cap_rank"),
-                ath=item.get("ath"),
-                atl=item.get("atl")
-            )
+        Returns:
+            CoinMarketData object
+        """
+        return CoinMarketData(
+            symbol=item["symbol"].upper(),
+            name=item["name"],
+            current_price=item["current_price"],
+            price_change_24h=item.get("price_change_percentage_24h") or 0,
+            volume_24h=item.get("total_volume"),
+            market_cap=item.get("market_cap"),
+            market_cap_rank=item.get("market_cap_rank"),
+            ath=item.get("ath"),
+            ath_date=_parse_date(item.get("ath_date")),
+            atl=item.get("atl"),
+            atl_date=_parse_date(item.get("atl_date"))
+        )
+    
+    def get_markets_by_symbols(
+        self,
+        symbols: List[str],
+        use_cache: bool = True
+    ) -> Dict[str, CoinMarketData]:
+        """
+        Get market data for the top-ranked coin of each symbol.
+        
+        The markets endpoint returns ATH/ATL values and dates inline, so no
+        per-coin detail request is needed. It also returns every coin that
+        shares a ticker, ordered by market cap, so pages of
+        MARKETS_PAGE_SIZE rows are requested until each symbol has been
+        seen or the results run out. Results are cached per symbol, so a
+        symbol is reused whatever batch it is next requested in.
+        
+        Args:
+            symbols: Coin symbols (e.g., ['BTC', 'ETH'])
+            use_cache: Whether to use cached data (default: True)
+        
+        Returns:
+            Mapping of upper-case symbol to market data of the highest
+            market cap coin with that symbol; unknown symbols are absent
+        """
+        wanted = {symbol.upper() for symbol in symbols}
+        found: Dict[str, CoinMarketData] = {}
+        
+        # Try cache first
+        if use_cache and self.cache_service:
+            for symbol in wanted:
+                cached = self.cache_service.get(f"market_symbol:{symbol}")
+                if cached:
+                    found[symbol] = cached
+        
+        missing = wanted - found.keys()
+        if not missing:
+            return found
+        
+        csv = ",".join(sorted(symbol.lower() for symbol in missing))
+        page = 1
+        while missing:
+            params = {
+                "vs_currency": "usd",
+                "symbols": csv,
+                "order": "market_cap_desc",
+                "per_page": self.MARKETS_PAGE_SIZE,
+                "page": page,
+                "sparkline": False
+            }
             
-            # Cache the result (shorter TTL for market data)
-            if self.cache_service:
-                self.cache_service.set(cache_key, market_data)
+            data = self._make_request("coins/markets", params)
             
-            return market_data
+            if data is None:
+                logger.error("Failed to fetch markets for %s", csv)
+                for symbol in missing:
+                    stale = self._stale_fallback(f"market_symbol:{symbol}")
+                    if stale is not None:
+                        found[symbol] = stale
+                break
             
-        except Exception as e:
-            logger.error(f"Failed to parse market data for {coin_id}: {e}")
-            return None
+            for item in data:
+                try:
+                    market = self._parse_market_row(item)
+                except Exception as e:
+                    logger.warning("Failed to parse market data: %s", e)
+                    continue
+                
+                # Rows are ordered by market cap; keep the top coin per symbol
+                if market.symbol in missing:
+                    missing.discard(market.symbol)
+                    found[market.symbol] = market
+                    if self.cache_service:
+                        self.cache_service.set(
+                            f"market_symbol:{market.symbol}", market,
+                            ttl=self.MARKET_DATA_TTL
+                        )
+            
+            if len(data) < self.MARKETS_PAGE_SIZE:
+                break
+            page += 1
+        
+        return found
+    
+    def get_market_by_symbol(self, symbol: str) -> Optional[CoinMarketData]:
+        """
+        Get market data for a coin by symbol, batching concurrent lookups.
+        
+        Lookups arriving within BATCH_WINDOW of each other are coalesced into
+        a single get_markets_by_symbols call, DataLoader-style.
+        
+        Args:
+            symbol: Coin symbol (e.g., 'BTC')
+        
+        Returns:
+            CoinMarketData for the highest-ranked coin with that symbol,
+            or None if not found
+        """
+        symbol = symbol.upper()
+        
+        with self._batch_lock:
+            batch = self._pending_batch
+            is_leader = batch is None
+            if is_leader:
+                batch = self._pending_batch = _SymbolBatch()
+            batch.symbols.add(symbol)
+        
+        if is_leader:
+            time.sleep(self.BATCH_WINDOW)
+            with self._batch_lock:
+                self._pending_batch = None
+            
+            try:
+                batch.results = self.get_markets_by_symbols(list(batch.symbols))
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait(timeout=30)
+        
+        return batch.results.get(symbol)
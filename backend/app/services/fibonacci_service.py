@@ -9,12 +9,16 @@ from typing import List, Optional, Tuple
 from datetime import datetime
 import logging
 
+import numpy as np
+
 from app.models import (
     FibonacciLevel, 
     FibonacciAnalysis, 
     AsianRangeData,
-    ATHATLData
+    ATHATLData,
+    CoinMarketData
 )
+from app.services import _fib_kernels
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +49,28 @@ class FibonacciService:
         (4.236, "423.6%")
     ]
     
+    # Per-ratio constants derived once from the tables above. Retracements
+    # are interpolated as ath * (1 - r) + atl * r so the 0% and 100% levels
+    # land exactly on ATH and ATL without rounding.
+    _RETRACEMENT_TERMS = tuple(
+        (ratio, 1.0 - ratio, label) for ratio, label in RETRACEMENT_LEVELS
+    )
+    _EXTENSION_TERMS = tuple(
+        (ratio, ratio - 1.0, label) for ratio, label in EXTENSION_LEVELS
+    )
+    
+    # Row vectors of the same terms for analyze_batch broadcasting
+    _RETRACEMENT_RATIOS = np.array([t[0] for t in _RETRACEMENT_TERMS])
+    _RETRACEMENT_ATH_WEIGHTS = np.array([t[1] for t in _RETRACEMENT_TERMS])
+    _EXTENSION_OFFSETS = np.array([t[1] for t in _EXTENSION_TERMS])
+    
+    # fib_all specialized for these terms (constants inlined)
+    _fib_all = staticmethod(_fib_kernels.make_fib_all(
+        [t[0] for t in _RETRACEMENT_TERMS],
+        [t[1] for t in _RETRACEMENT_TERMS],
+        [t[1] for t in _EXTENSION_TERMS]
+    ))
+    
     def __init__(self):
         """Initialize the Fibonacci service."""
         logger.info("FibonacciService initialized")
@@ -64,10 +90,25 @@ class FibonacciService:
         Args:
             ath: All-time high price
             atl: All-time low price
-            
+        
         Returns:
             List of Fibonacci retracement levels
-            
+        
+        Raises:
+            ValueError: If ATH <= ATL or if values are invalid
+        """
+        self._validate_range(ath, atl)
+        return self._retracement_levels(ath, atl)
+    
+    @staticmethod
+    def _validate_range(ath: float, atl: float) -> None:
+        """
+        Check that ATH/ATL describe a usable price range.
+        
+        Args:
+            ath: All-time high price
+            atl: All-time low price
+        
         Raises:
             ValueError: If ATH <= ATL or if values are invalid
         """
@@ -76,22 +117,23 @@ class FibonacciService:
         
         if ath <= atl:
             raise ValueError("ATH must be greater than ATL")
-        
-        price_range = ath - atl
-        levels = []
-        
-        for ratio, label in self.RETRACEMENT_LEVELS:
-            price = ath - (price_range * ratio)
-            levels.append(
-                FibonacciLevel(
-                    level=ratio,
-                    price=round(price, 8),
-                    label=label,
-                    type="retracement"
-                )
+    
+    def _retracement_levels(self, ath: float, atl: float) -> List[FibonacciLevel]:
+        """Build retracement levels for an already validated range."""
+        levels = [
+            FibonacciLevel(
+                level=ratio,
+                price=ath * ath_weight + atl * ratio,
+                label=label,
+                type="retracement"
             )
+            for ratio, ath_weight, label in self._RETRACEMENT_TERMS
+        ]
         
-        logger.debug(f"Calculated {len(levels)} retracement levels for ATH={ath}, ATL={atl}")
+        logger.debug(
+            "Calculated %s retracement levels for ATH=%s, ATL=%s",
+            len(levels), ath, atl
+        )
         return levels
     
     def calculate_extension_levels(
@@ -108,34 +150,33 @@ class FibonacciService:
         Args:
             ath: All-time high price
             atl: All-time low price
-            
+        
         Returns:
             List of Fibonacci extension levels
-            
+        
         Raises:
             ValueError: If ATH <= ATL or if values are invalid
         """
-        if ath <= 0 or atl <= 0:
-            raise ValueError("ATH and ATL must be positive values")
-        
-        if ath <= atl:
-            raise ValueError("ATH must be greater than ATL")
-        
+        self._validate_range(ath, atl)
+        return self._extension_levels(ath, atl)
+    
+    def _extension_levels(self, ath: float, atl: float) -> List[FibonacciLevel]:
+        """Build extension levels for an already validated range."""
         price_range = ath - atl
-        levels = []
-        
-        for ratio, label in self.EXTENSION_LEVELS:
-            price = ath + (price_range * (ratio - 1))
-            levels.append(
-                FibonacciLevel(
-                    level=ratio,
-                    price=round(price, 8),
-                    label=label,
-                    type="extension"
-                )
+        levels = [
+            FibonacciLevel(
+                level=ratio,
+                price=ath + price_range * offset,
+                label=label,
+                type="extension"
             )
+            for ratio, offset, label in self._EXTENSION_TERMS
+        ]
         
-        logger.debug(f"Calculated {len(levels)} extension levels for ATH={ath}, ATL={atl}")
+        logger.debug(
+            "Calculated %s extension levels for ATH=%s, ATL=%s",
+            len(levels), ath, atl
+        )
         return levels
     
     def find_nearest_levels(
@@ -147,27 +188,39 @@ class FibonacciService:
         """
         Find nearest support and resistance levels.
         
+        Relies on the order produced by the calculate_* methods: retracement
+        prices descend from ATH to ATL and extension prices ascend above ATH,
+        so both lists are scanned once without merging or sorting.
+        
         Args:
             current_price: Current price
-            retracement_levels: List of retracement levels
-            extension_levels: List of extension levels
-            
+            retracement_levels: Retracement levels, ordered ATH -> ATL
+            extension_levels: Extension levels, ordered ascending
+        
         Returns:
             Tuple of (nearest_support, nearest_resistance)
         """
-        all_levels = retracement_levels + extension_levels
-        
-        # Sort by price
-        all_levels.sort(key=lambda x: x.price)
-        
         nearest_support = None
         nearest_resistance = None
         
-        for level in all_levels:
+        # Descending: the last level above the price is the closest one, and
+        # the first one below it is the closest support
+        for level in retracement_levels:
             if level.price < current_price:
                 nearest_support = level
-            elif level.price > current_price and nearest_resistance is None:
+                break
+            if level.price > current_price:
                 nearest_resistance = level
+        
+        # Ascending and all above ATH: any level below the price outranks a
+        # retracement support, and the first one above is only needed when
+        # the price is at or beyond ATH
+        for level in extension_levels:
+            if level.price < current_price:
+                nearest_support = level
+            elif level.price > current_price:
+                if nearest_resistance is None:
+                    nearest_resistance = level
                 break
         
         return nearest_support, nearest_resistance
@@ -188,7 +241,7 @@ class FibonacciService:
             current_price: Current price
             ath: All-time high price
             atl: All-time low price
-            
+        
         Returns:
             Position percentage (0-100)
         """
@@ -210,23 +263,37 @@ class FibonacciService:
         """
         Perform complete Fibonacci analysis for a coin.
         
+        The range is not re-validated here. ATHATLData guarantees
+        0 < atl < ath and is immutable, so an invalid range fails earlier:
+        constructing the ATHATLData raises pydantic.ValidationError (a
+        ValueError subclass).
+        
         Args:
             symbol: Coin symbol
             ath_atl_data: ATH/ATL data object
-            
+        
         Returns:
             Complete Fibonacci analysis
-            
-        Raises:
-            ValueError: If data is invalid
         """
         ath = ath_atl_data.ath
         atl = ath_atl_data.atl
         current_price = ath_atl_data.current_price
         
-        # Calculate retracement and extension levels
-        retracement_levels = self.calculate_retracement_levels(ath, atl)
-        extension_levels = self.calculate_extension_levels(ath, atl)
+        # Compute every price and the position in one kernel call before
+        # any level objects are built
+        values = self._fib_all(ath, atl, current_price)
+        retracement_levels = [
+            FibonacciLevel(level=ratio, price=level_price, label=label, type="retracement")
+            for (ratio, _, label), level_price in zip(
+                self._RETRACEMENT_TERMS, values[_fib_kernels.RETRACEMENT_SLICE]
+            )
+        ]
+        extension_levels = [
+            FibonacciLevel(level=ratio, price=level_price, label=label, type="extension")
+            for (ratio, _, label), level_price in zip(
+                self._EXTENSION_TERMS, values[_fib_kernels.EXTENSION_SLICE]
+            )
+        ]
         
         # Find nearest support and resistance
         nearest_support, nearest_resistance = self.find_nearest_levels(
@@ -235,15 +302,17 @@ class FibonacciService:
             extension_levels
         )
         
-        # Calculate position percentage
-        position_pct = self.calculate_position_percentage(current_price, ath, atl)
+        # Clamping to 0/100 commutes with rounding, so rounding the kernel's
+        # clamped value matches calculate_position_percentage
+        price_range = ath - atl
+        position_pct = round(values[_fib_kernels.POSITION_INDEX], 2)
         
         analysis = FibonacciAnalysis(
             symbol=symbol,
             ath=ath,
             atl=atl,
             current_price=current_price,
-            price_range=ath - atl,
+            price_range=price_range,
             retracement_levels=retracement_levels,
             extension_levels=extension_levels,
             nearest_support=nearest_support,
@@ -251,14 +320,137 @@ class FibonacciService:
             position_percentage=position_pct
         )
         
-        logger.info(
-            f"Fibonacci analysis completed for {symbol}: "
-            f"position={position_pct}%, support={nearest_support.price if nearest_support else 'N/A'}, "
-            f"resistance={nearest_resistance.price if nearest_resistance else 'N/A'}"
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Fibonacci analysis completed for %s: position=%s%%, "
+                "support=%s, resistance=%s",
+                symbol,
+                position_pct,
+                nearest_support.price if nearest_support else 'N/A',
+                nearest_resistance.price if nearest_resistance else 'N/A'
+            )
         
         return analysis
     
+    @staticmethod
+    def _ladder_level(
+        retracement_levels: List[FibonacciLevel],
+        extension_levels: List[FibonacciLevel],
+        index: int
+    ) -> Optional[FibonacciLevel]:
+        """
+        Look up a level by its position in the ascending price ladder.
+        
+        The ladder is the retracements reversed (ATL -> ATH) followed by the
+        extensions; indexing into both lists avoids building it per coin.
+        
+        Args:
+            retracement_levels: Retracement levels, ordered ATH -> ATL
+            extension_levels: Extension levels, ordered ascending
+            index: Ladder position
+        
+        Returns:
+            The level at index, or None if it falls outside the ladder
+        """
+        if index < 0:
+            return None
+        n_retracements = len(retracement_levels)
+        if index < n_retracements:
+            return retracement_levels[n_retracements - 1 - index]
+        index -= n_retracements
+        return extension_levels[index] if index < len(extension_levels) else None
+    
+    def analyze_batch(
+        self,
+        coins: List[CoinMarketData]
+    ) -> List[Optional[FibonacciAnalysis]]:
+        """
+        Perform Fibonacci analysis for many coins at once.
+        
+        Level prices for all coins are computed with NumPy broadcasting
+        ([N, 7] retracements, [N, 4] extensions) using the same arithmetic
+        as analyze, so results are identical. Each row of the combined
+        ascending price ladder is sorted, which lets nearest support and
+        resistance be found by counting levels below the current price.
+        
+        Args:
+            coins: Market data carrying ath, atl and current_price
+        
+        Returns:
+            Analyses in the same order as coins; None where the ATH/ATL
+            data is missing or invalid
+        """
+        if not coins:
+            return []
+        
+        ath = np.array([c.ath or 0.0 for c in coins], dtype=np.float64)
+        atl = np.array([c.atl or 0.0 for c in coins], dtype=np.float64)
+        price = np.array([c.current_price for c in coins], dtype=np.float64)
+        valid = (atl > 0) & (ath > atl) & (price > 0)
+        
+        price_range = ath - atl
+        ret_prices = (
+            ath[:, None] * self._RETRACEMENT_ATH_WEIGHTS
+            + atl[:, None] * self._RETRACEMENT_RATIOS
+        )
+        ext_prices = ath[:, None] + price_range[:, None] * self._EXTENSION_OFFSETS
+        
+        # Retracements reversed (ATL -> ATH) followed by extensions gives an
+        # ascending ladder per row, so counts act as a row-wise searchsorted
+        ladder = np.concatenate((ret_prices[:, ::-1], ext_prices), axis=1)
+        support_idx = (ladder < price[:, None]).sum(axis=1) - 1
+        resistance_idx = (ladder <= price[:, None]).sum(axis=1)
+        
+        results: List[Optional[FibonacciAnalysis]] = []
+        rows = zip(
+            coins,
+            valid.tolist(),
+            ret_prices.tolist(),
+            ext_prices.tolist(),
+            support_idx.tolist(),
+            resistance_idx.tolist()
+        )
+        for coin, is_valid, ret_row, ext_row, support, resistance in rows:
+            if not is_valid:
+                results.append(None)
+                continue
+            
+            retracement_levels = [
+                FibonacciLevel(level=ratio, price=level_price, label=label, type="retracement")
+                for (ratio, _, label), level_price in zip(self._RETRACEMENT_TERMS, ret_row)
+            ]
+            extension_levels = [
+                FibonacciLevel(level=ratio, price=level_price, label=label, type="extension")
+                for (ratio, _, label), level_price in zip(self._EXTENSION_TERMS, ext_row)
+            ]
+            
+            coin_range = coin.ath - coin.atl
+            results.append(FibonacciAnalysis(
+                symbol=coin.symbol,
+                ath=coin.ath,
+                atl=coin.atl,
+                current_price=coin.current_price,
+                price_range=coin_range,
+                retracement_levels=retracement_levels,
+                extension_levels=extension_levels,
+                nearest_support=self._ladder_level(
+                    retracement_levels, extension_levels, support
+                ),
+                nearest_resistance=self._ladder_level(
+                    retracement_levels, extension_levels, resistance
+                ),
+                position_percentage=max(0.0, min(100.0, round(
+                    (coin.current_price - coin.atl) / coin_range * 100.0, 2
+                )))
+            ))
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Batch Fibonacci analysis completed for %s/%s coins",
+                len(coins) - results.count(None), len(coins)
+            )
+        return results
+    
     def calculate_asian_range_fib(
         self, 
         body_high: float, 
@@ -270,10 +462,10 @@ class FibonacciService:
         Args:
             body_high: High of the Asian range body
             body_low: Low of the Asian range body
-            
+        
         Returns:
             50% Fibonacci level (midpoint)
-            
+        
         Raises:
             ValueError: If body_high <= body_low or values are invalid
         """
@@ -286,8 +478,8 @@ class FibonacciService:
         fib_50 = (body_high + body_low) / 2
         
         logger.debug(
-            f"Asian Range 50% Fib: {fib_50} "
-            f"(high={body_high}, low={body_low})"
+            "Asian Range 50%% Fib: %s (high=%s, low=%s)",
+            fib_50, body_high, body_low
         )
         
         return round(fib_50, 8)
@@ -6,17 +6,26 @@ CoinGecko data, Fibonacci analysis, and Asian Range calculations.
 """
 
 import logging
+from hashlib import blake2b
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from app.models import CoinMarketData, ScanResult, FibonacciAnalysis
+import orjson
+from pydantic import TypeAdapter
+
+from app.config import config
+from app.models import ATHATLData, CoinMarketData, ScanResult, FibonacciAnalysis
 from app.services.coingecko_service import CoinGeckoService
 from app.services.fibonacci_service import FibonacciService
 from app.services.cache_service import CacheService
+from app.utils.json import dumps
 
 logger = logging.getLogger(__name__)
 
+# Converts coin lists to plain Python in one pydantic-core call; orjson
+# then encodes them, so datetimes match every other endpoint's format
+_COINS_ADAPTER = TypeAdapter(List[CoinMarketData])
+
 
 class ScannerService:
     """
@@ -56,7 +65,7 @@ class ScannerService:
         Args:
             coin_id: CoinGecko coin ID
             include_fibonacci: Whether to include Fibonacci analysis
-            
+        
         Returns:
             CoinMarketData with analysis or None if failed
         """
@@ -64,91 +73,103 @@ class ScannerService:
             # Get basic market data
             market_data = self.coingecko_service.get_coin_market_data(coin_id)
             if not market_data:
-                logger.warning(f"Failed to get market data for {coin_id}")
+                logger.warning("Failed to get market data for %s", coin_id)
                 return None
             
-            # Add Fibonacci analysis if requested
-            if include_fibonacci and market_data.ath and market_data.atl:
+            # Add Fibonacci analysis if requested. Coins without a usable
+            # ATH/ATL range (e.g. fresh listings with ATH == ATL) are skipped
+            # here rather than failing validation inside the try below
+            ath, atl = market_data.ath, market_data.atl
+            if include_fibonacci and ath and atl and 0 < atl < ath:
+                # Copy so the cached market data object is not mutated
+                market_data = market_data.model_copy()
                 try:
-                    # Get detailed ATH/ATL data
-                    ath_atl_data = self.coingecko_service.get_coin_ath_atl(coin_id)
-                    if ath_atl_data:
-                        fibonacci_analysis = self.fibonacci_service.analyze(
-                            symbol=market_data.symbol,
-                            ath_atl_data=ath_atl_data
-                        )
-                        market_data.fibonacci_analysis = fibonacci_analysis
+                    # Fibonacci analysis only needs the ATH/ATL values the
+                    # markets row already carries; dates are passed through
+                    # when present but never fetched from coins/{id}
+                    ath_atl_data = ATHATLData(
+                        ath=market_data.ath,
+                        ath_date=market_data.ath_date,
+                        atl=market_data.atl,
+                        atl_date=market_data.atl_date,
+                        current_price=market_data.current_price
+                    )
+                    market_data.fibonacci_analysis = self.fibonacci_service.analyze(
+                        symbol=market_data.symbol,
+                        ath_atl_data=ath_atl_data
+                    )
                 except Exception as e:
                     logger.warning(
-                        f"Failed to calculate Fibonacci for {coin_id}: {e}"
+                        "Failed to calculate Fibonacci for %s: %s", coin_id, e
                     )
             
             return market_data
-            
+        
         except Exception as e:
-            logger.error(f"Error scanning coin {coin_id}: {e}")
+            logger.error("Error scanning coin %s: %s", coin_id, e)
             return None
     
     def scan_multiple_coins(
         self,
         coin_ids: List[str],
-        include_fibonacci: bool = True,
-        max_workers: int = 10
+        include_fibonacci: bool = True
     ) -> List[CoinMarketData]:
         """
-        Scan multiple coins concurrently.
+        Scan multiple coins using batched market data.
+        
+        Market rows for all coins come from coins/markets in one call per
+        250 ids, and Fibonacci analysis runs in-process on their ATH/ATL as
+        a single vectorized batch. Coins missing from the bulk response are
+        not retried one by one: the same endpoint would fail the same way,
+        multiplying requests against a degraded upstream.
         
         Args:
             coin_ids: List of CoinGecko coin IDs
             include_fibonacci: Whether to include Fibonacci analysis
-            max_workers: Maximum concurrent workers
-            
+        
         Returns:
-            List of CoinMarketData objects (successful scans only)
+            List of CoinMarketData objects (successful scans only),
+            in the same order as coin_ids
         """
-        results = []
         total = len(coin_ids)
-        completed = 0
+        if total == 0:
+            return []
         
         logger.info(
-            f"Starting scan of {total} coins "
-            f"(fibonacci={include_fibonacci}, workers={max_workers})"
+            "Starting scan of %s coins (fibonacci=%s)", total, include_fibonacci
         )
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            future_to_coin = {
-                executor.submit(
-                    self.scan_coin, 
-                    coin_id, 
-                    include_fibonacci
-                ): coin_id
-                for coin_id in coin_ids
-            }
+        markets = self.coingecko_service.get_markets_bulk(coin_ids)
+        
+        if include_fibonacci and markets:
+            found = [coin_id for coin_id in coin_ids if coin_id in markets]
+            analyses = self.fibonacci_service.analyze_batch(
+                [markets[coin_id] for coin_id in found]
+            )
+            for coin_id, analysis in zip(found, analyses):
+                if analysis is not None:
+                    # Copy so the cached market data object is not mutated
+                    markets[coin_id] = markets[coin_id].model_copy(
+                        update={"fibonacci_analysis": analysis}
+                    )
+        
+        # Checked once: the per-coin debug line is the hottest log call
+        debug = logger.isEnabledFor(logging.DEBUG)
+        results = []
+        for index, coin_id in enumerate(coin_ids, 1):
+            market_data = markets.get(coin_id)
             
-            # Process completed tasks
-            for future in as_completed(future_to_coin):
-                coin_id = future_to_coin[future]
-                completed += 1
-                
-                try:
-                    result = future.result()
-                    if result:
-                        results.append(result)
-                        logger.debug(
-                            f"[{completed}/{total}] Successfully scanned {coin_id}"
-                        )
-                    else:
-                        logger.warning(
-                            f"[{completed}/{total}] Failed to scan {coin_id}"
-                        )
-                except Exception as e:
-                    logger.error(
-                        f"[{completed}/{total}] Exception scanning {coin_id}: {e}"
+            if market_data:
+                results.append(market_data)
+                if debug:
+                    logger.debug(
+                        "[%s/%s] Successfully scanned %s", index, total, coin_id
                     )
+            else:
+                logger.warning("[%s/%s] Failed to scan %s", index, total, coin_id)
         
         logger.info(
-            f"Scan completed: {len(results)}/{total} coins successful"
+            "Scan completed: %s/%s coins successful", len(results), total
         )
         return results
     
@@ -165,11 +186,11 @@ class ScannerService:
             limit: Number of top coins to scan
             include_fibonacci: Whether to include Fibonacci analysis
             filters: Optional filters to apply
-            
+        
         Returns:
             ScanResult with analyzed coins
         """
-        logger.info(f"Scanning top {limit} coins...")
+        logger.info("Scanning top %s coins...", limit)
         
         # Get top coins list
         top_coins = self.coingecko_service.get_top_coins(limit=limit)
@@ -188,18 +209,15 @@ class ScannerService:
         # Scan all coins
         scanned_coins = self.scan_multiple_coins(
             coin_ids=coin_ids,
-            include_fibonacci=include_fibonacci,
-            max_workers=10
+            include_fibonacci=include_fibonacci
         )
         
         # Apply filters if provided
         if filters:
             scanned_coins = self._apply_filters(scanned_coins, filters)
         
-        # Sort by market cap rank
-        scanned_coins.sort(
-            key=lambda x: x.market_cap_rank if x.market_cap_rank else 9999
-        )
+        # No sort needed: top coins arrive in market cap order and both the
+        # scan and the filters preserve the order of coin_ids
         
         result = ScanResult(
             total_coins=len(scanned_coins),
@@ -209,12 +227,105 @@ class ScannerService:
         )
         
         logger.info(
-            f"Scan completed: {result.total_coins} coins "
-            f"(filters: {filters is not None})"
+            "Scan completed: %s coins (filters: %s)",
+            result.total_coins, filters is not None
         )
         
         return result
     
+    @staticmethod
+    def _scan_cache_key(
+        limit: int,
+        include_fibonacci: bool,
+        filters: Optional[Dict[str, Any]]
+    ) -> str:
+        """
+        Build the cache key for an encoded scan payload.
+        
+        Args:
+            limit: Number of top coins scanned
+            include_fibonacci: Whether Fibonacci analysis is included
+            filters: Filters applied
+        
+        Returns:
+            Cache key string
+        """
+        filters_blob = orjson.dumps(filters or {}, option=orjson.OPT_SORT_KEYS)
+        filters_hash = blake2b(filters_blob, digest_size=8).hexdigest()
+        return f"scan:v2:{limit}:{include_fibonacci}:{filters_hash}"
+    
+    def get_cached_scan_bytes(
+        self,
+        limit: int,
+        include_fibonacci: bool,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Optional[bytes]:
+        """
+        Get a previously encoded scan payload from cache.
+        
+        Args:
+            limit: Number of top coins scanned
+            include_fibonacci: Whether Fibonacci analysis is included
+            filters: Filters applied
+        
+        Returns:
+            JSON bytes or None if not cached
+        """
+        if not self.cache_service:
+            return None
+        return self.cache_service.get(
+            self._scan_cache_key(limit, include_fibonacci, filters)
+        )
+    
+    def scan_top_coins_json(
+        self,
+        limit: int = 100,
+        include_fibonacci: bool = True,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> bytes:
+        """
+        Scan top coins and return the JSON-encoded result.
+        
+        The encoded payload is cached for MARKET_DATA_TTL, so repeated scans
+        with the same parameters skip both the scan and serialization while
+        the prices they carry stay fresh.
+        
+        Args:
+            limit: Number of top coins to scan
+            include_fibonacci: Whether to include Fibonacci analysis
+            filters: Optional filters to apply
+        
+        Returns:
+            JSON bytes of the scan result
+        """
+        cached = self.get_cached_scan_bytes(limit, include_fibonacci, filters)
+        if cached is not None:
+            logger.debug("Retrieved encoded scan (limit=%s) from cache", limit)
+            return cached
+        
+        result = self.scan_top_coins(
+            limit=limit,
+            include_fibonacci=include_fibonacci,
+            filters=filters
+        )
+        
+        payload = dumps({
+            'total_coins': result.total_coins,
+            'coins': _COINS_ADAPTER.dump_python(result.coins),
+            'timestamp': result.timestamp,
+            'filters_applied': result.filters_applied
+        })
+        
+        # Don't pin an empty (possibly failed) scan for a full TTL
+        if self.cache_service and result.coins:
+            self.cache_service.set(
+                self._scan_cache_key(limit, include_fibonacci, filters),
+                payload,
+                ttl=config.MARKET_DATA_TTL
+            )
+        
+        return payload
+    
     def _apply_filters(
         self,
         coins: List[CoinMarketData],
@@ -226,56 +337,38 @@ class ScannerService:
         Args:
             coins: List of coins to filter
             filters: Filter criteria
-            
+        
         Returns:
             Filtered coin list
         """
-        filtered = coins
-        
-        # Filter by minimum volume
-        if "min_volume" in filters:
-            min_vol = float(filters["min_volume"])
-            filtered = [
-                c for c in filtered 
-                if c.volume_24h and c.volume_24h >= min_vol
-            ]
-        
-        # Filter by minimum market cap
-        if "min_market_cap" in filters:
-            min_cap = float(filters["min_market_cap"])
-            filtered = [
-                c for c in filtered 
-                if c.market_cap and c.market_cap >= min_cap
-            ]
-        
-        # Filter by price change
-        if "min_change_24h" in filters:
-            min_change = float(filters["min_change_24h"])
-            filtered = [c for c in filtered if c.price_change_24h >= min_change]
-        
-        if "max_change_24h" in filters:
-            max_change = float(filters["max_change_24h"])
-            filtered = [c for c in filtered if c.price_change_24h <= max_change]
-        
-        # Filter by Fibonacci position
-        if "min_fib_position" in filters:
-            min_pos = float(filters["min_fib_position"])
-            filtered = [
-                c for c in filtered 
-                if c.fibonacci_analysis and 
-                c.fibonacci_analysis.position_percentage >= min_pos
-            ]
-        
-        if "max_fib_position" in filters:
-            max_pos = float(filters["max_fib_position"])
-            filtered = [
-                c for c in filtered 
-                if c.fibonacci_analysis and 
-                c.fibonacci_analysis.position_percentage <= max_pos
-            ]
+        # Absent bounds default to +/-inf so every clause can be evaluated
+        # in a single pass; a missing volume or market cap maps to -inf,
+        # which fails any explicit minimum just like before
+        inf = float("inf")
+        min_vol = float(filters.get("min_volume", -inf))
+        min_cap = float(filters.get("min_market_cap", -inf))
+        min_change = float(filters.get("min_change_24h", -inf))
+        max_change = float(filters.get("max_change_24h", inf))
+        min_pos = float(filters.get("min_fib_position", -inf))
+        max_pos = float(filters.get("max_fib_position", inf))
+        need_fib = "min_fib_position" in filters or "max_fib_position" in filters
+        
+        filtered = [
+            c for c in coins
+            if (c.volume_24h or -inf) >= min_vol
+            and (c.market_cap or -inf) >= min_cap
+            and min_change <= c.price_change_24h <= max_change
+            and (
+                not need_fib
+                or (
+                    c.fibonacci_analysis is not None
+                    and min_pos <= c.fibonacci_analysis.position_percentage <= max_pos
+                )
+            )
+        ]
         
         logger.info(
-            f"Filters applied: {len(coins)} -> {len(filtered)} coins"
+            "Filters applied: %s -> %s coins", len(coins), len(filtered)
         )
         
         return filtered
@@ -291,23 +384,16 @@ class ScannerService:
         Args:
             symbol: Coin symbol (e.g., 'BTC', 'ETH')
             include_fibonacci: Whether to include Fibonacci analysis
-            
+        
         Returns:
             CoinMarketData or None if not found
         """
         symbol = symbol.upper()
         
-        # Search in top coins to find the coin ID
-        top_coins = self.coingecko_service.get_top_coins(limit=100)
-        
-        coin_id = None
-        for coin in top_coins:
-            if coin.symbol == symbol:
-                coin_id = coin.id
-                break
+        coin_id = self.coingecko_service.get_symbol_to_id_map().get(symbol)
         
         if not coin_id:
-            logger.warning(f"Coin with symbol {symbol} not found in top 100")
+            logger.warning("Coin with symbol %s not found in top coins", symbol)
             return None
         
         return self.scan_coin(coin_id, include_fibonacci)
@@ -0,0 +1,15 @@
+"""Utility helpers for Trade-Scan backend."""
+
+from app.utils.json import (
+    ORJSONProvider,
+    dumps,
+    json_bytes_response,
+    json_response
+)
+
+__all__ = [
+    "ORJSONProvider",
+    "dumps",
+    "json_bytes_response",
+    "json_response",
+]
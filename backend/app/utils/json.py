@@ -0,0 +1,160 @@
+"""
+JSON response helpers for Trade-Scan API.
+
+This module provides orjson-based response encoding, which is considerably
+faster than Flask's stdlib ``json`` encoder for large scan payloads.
+"""
+
+from hashlib import blake2b
+from typing import Any, Callable, Dict, Union
+
+import orjson
+from flask import Response, request
+from flask.json.provider import JSONProvider
+from pydantic import BaseModel
+
+from app.config import config
+
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+
+# Bound pydantic-core serializers, cached per model class
+_TO_PYTHON: Dict[type, Callable[[Any], Any]] = {}
+
+
+def _default(obj: Any) -> Any:
+    """
+    Serialize objects orjson does not handle natively.
+    
+    Args:
+        obj: Object to serialize
+    
+    Returns:
+        JSON-compatible representation of the object
+    
+    Raises:
+        TypeError: If the object type is not supported
+    """
+    cls = type(obj)
+    to_python = _TO_PYTHON.get(cls)
+    if to_python is None:
+        if not isinstance(obj, BaseModel):
+            raise TypeError(f"Type is not JSON serializable: {cls.__name__}")
+        # Serialize in pydantic-core directly, bypassing model_dump()
+        to_python = _TO_PYTHON[cls] = cls.__pydantic_serializer__.to_python
+    return to_python(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize an object to JSON bytes with orjson.
+    
+    Pydantic models may be passed directly, either at the top level or
+    nested inside dicts and lists.
+    
+    Args:
+        obj: Object to serialize
+    
+    Returns:
+        UTF-8 encoded JSON
+    """
+    return orjson.dumps(obj, default=_default, option=JSON_OPTIONS)
+
+
+def json_bytes_response(
+    body: bytes,
+    status: int = 200,
+    conditional: bool = False
+) -> Response:
+    """
+    Build a JSON response from already-encoded bytes.
+    
+    Conditional responses carry an ETag derived from the body and short-circuit
+    to ``304 Not Modified`` when a GET request's If-None-Match matches it.
+    
+    Args:
+        body: UTF-8 encoded JSON
+        status: HTTP status code (default: 200)
+        conditional: Whether to add ETag/Cache-Control headers (default: False)
+    
+    Returns:
+        Flask response with JSON body
+    """
+    if not conditional:
+        return Response(body, status=status, mimetype='application/json')
+    
+    etag = blake2b(body, digest_size=8).hexdigest()
+    
+    # 304 is only defined for safe methods; other methods still get the ETag
+    if request.method in ('GET', 'HEAD') and request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, status=status, mimetype='application/json')
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={config.MARKET_DATA_TTL}'
+    return response
+
+
+def json_response(obj: Any, status: int = 200, conditional: bool = False) -> Response:
+    """
+    Build a JSON response encoded with orjson.
+    
+    Args:
+        obj: Object to serialize
+        status: HTTP status code (default: 200)
+        conditional: Whether to add ETag/Cache-Control headers (default: False)
+    
+    Returns:
+        Flask response with JSON body
+    """
+    return json_bytes_response(dumps(obj), status=status, conditional=conditional)
+
+
+class ORJSONProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+    
+    Installed as ``app.json`` so that ``jsonify``, ``request.get_json`` and
+    any other code using Flask's JSON hooks share the encoder used by
+    json_response, including direct Pydantic model support.
+    """
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Serialize an object to a JSON string.
+        
+        Args:
+            obj: Object to serialize
+            **kwargs: Ignored; accepted for JSONProvider compatibility
+        
+        Returns:
+            JSON string
+        """
+        return dumps(obj).decode()
+    
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        """
+        Deserialize JSON text.
+        
+        Args:
+            s: JSON string or UTF-8 bytes
+            **kwargs: Ignored; accepted for JSONProvider compatibility
+        
+        Returns:
+            Deserialized object
+        """
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """
+        Build a JSON response, writing orjson's bytes without a str round trip.
+        
+        Args:
+            *args: A single object, or several treated as a list
+            **kwargs: Treated as a dict; cannot be combined with args
+        
+        Returns:
+            Flask response with JSON body
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype='application/json')
@@ -8,19 +8,38 @@ logger = logging.getLogger(__name__)
 
 
 def main():
-    """Start the Flask application."""
+    """
+    Start the Flask application.
+    
+    Debug mode keeps the Werkzeug development server and its reloader;
+    otherwise the app is served by waitress's multi-threaded WSGI server.
+    """
     app = create_app()
     
     logger.info(
-        f"Starting Trade-Scan API server on {config.HOST}:{config.PORT} "
-        f"(debug={config.DEBUG})"
+        "Starting Trade-Scan API server on %s:%s (debug=%s)",
+        config.HOST, config.PORT, config.DEBUG
     )
     
-    app.run(
-        host=config.HOST,
-        port=config.PORT,
-        debug=config.DEBUG
-    )
+    if config.DEBUG:
+        app.run(
+            host=config.HOST,
+            port=config.PORT,
+            debug=True
+        )
+        return
+    
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.warning(
+            "waitress is not installed; falling back to the Flask "
+            "development server"
+        )
+        app.run(host=config.HOST, port=config.PORT, debug=False, threaded=True)
+        return
+    
+    serve(app, host=config.HOST, port=config.PORT, threads=config.SERVER_THREADS)
 
 
 if __name__ == '__main__':
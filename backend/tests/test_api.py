@@ -0,0 +1,218 @@
+"""Integration tests for the Flask API with a stubbed CoinGecko client."""
+
+from datetime import datetime
+
+import orjson
+import pytest
+
+from app import create_app
+from app.services import cache_service as cache_service_module
+from app.services.coingecko_service import RateLimiter
+
+
+def _market_row(index):
+    """Build a coins/markets row for a fake coin."""
+    return {
+        "id": f"coin{index}",
+        "symbol": f"c{index}",
+        "name": f"Coin {index}",
+        "market_cap_rank": index,
+        "current_price": 10.0 + index,
+        "price_change_percentage_24h": index - 2.0,
+        "total_volume": 1e6 * index,
+        "market_cap": 1e9 / index,
+        "ath": 100.0 + index,
+        "ath_date": "2021-11-10T14:24:11.849Z",
+        "atl": 1.0,
+        "atl_date": "2015-10-20T00:00:00.000Z"
+    }
+
+
+MARKETS = [_market_row(index) for index in range(1, 6)]
+
+
+class FakeResponse:
+    """Minimal stand-in for httpx.Response."""
+    
+    def __init__(self, payload):
+        self.status_code = 200
+        self.content = orjson.dumps(payload)
+        self.text = ""
+        self.headers = {}
+
+
+class FakeCoinGeckoSession:
+    """Answers coins/markets requests from its rows and counts them."""
+    
+    def __init__(self):
+        self.calls = 0
+        self.rows = list(MARKETS)
+    
+    def get(self, url, params=None):
+        self.calls += 1
+        params = params or {}
+        rows = self.rows
+        if "ids" in params:
+            ids = params["ids"].split(",")
+            rows = [row for row in rows if row["id"] in ids]
+        if "symbols" in params:
+            symbols = params["symbols"].split(",")
+            rows = [row for row in rows if row["symbol"] in symbols]
+        return FakeResponse(rows[:int(params.get("per_page", 250))])
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create an app with a fresh cache and a stubbed CoinGecko session."""
+    monkeypatch.setattr(cache_service_module, "_cache_service", None)
+    app = create_app()
+    app.testing = True
+    
+    coingecko_service = app.extensions["coingecko_service"]
+    coingecko_service._session = FakeCoinGeckoSession()
+    coingecko_service.rate_limiter = RateLimiter(calls_per_minute=10**6)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    """Create a test client for the app."""
+    return app.test_client()
+
+
+@pytest.fixture
+def upstream(app):
+    """The stubbed CoinGecko session, for counting requests."""
+    return app.extensions["coingecko_service"].session
+
+
+class TestDateFormat:
+    """Test that every endpoint encodes datetimes the same way."""
+    
+    @pytest.mark.parametrize("method, url", [
+        ("GET", "/api/v1/coins?limit=3"),
+        ("POST", "/api/v1/scan"),
+        ("GET", "/api/v1/coins/C1"),
+        ("GET", "/api/v1/coins/C1/ath-atl"),
+    ])
+    def test_dates_use_utc_offset(self, client, method, url):
+        """Test dates parse with fromisoformat on every supported Python."""
+        response = client.open(url, method=method, json={"limit": 3})
+        body = response.get_json()
+        coin = body["coins"][0] if "coins" in body else body
+        
+        assert response.status_code == 200
+        assert coin["ath_date"] == "2021-11-10T14:24:11.849000+00:00"
+        datetime.fromisoformat(coin["atl_date"])
+        if "timestamp" in body:
+            assert body["timestamp"].endswith("+00:00")
+
+
+class TestErrors:
+    """Test that client errors always come back as JSON."""
+    
+    def _assert_error(self, response, status_code):
+        assert response.status_code == status_code
+        assert response.mimetype == "application/json"
+        body = response.get_json()
+        assert body["status_code"] == status_code
+        assert body["error"] and body["timestamp"]
+    
+    def test_unknown_route(self, client):
+        """Test that a 404 from routing is JSON."""
+        self._assert_error(client.get("/api/v1/nope"), 404)
+    
+    def test_method_not_allowed(self, client):
+        """Test that a 405 is JSON and keeps its Allow header."""
+        response = client.delete("/api/v1/scan")
+        
+        self._assert_error(response, 405)
+        assert "POST" in response.headers["Allow"]
+    
+    def test_malformed_json_body(self, client):
+        """Test that an undecodable scan body is a JSON 400."""
+        response = client.post(
+            "/api/v1/scan", data="{not json", content_type="application/json"
+        )
+        self._assert_error(response, 400)
+    
+    @pytest.mark.parametrize("body", [
+        ["x"],
+        {"filters": ["x"]},
+        {"filters": {"min_volume": {"gt": 1}}},
+        {"include_fibonacci": "yes"},
+    ])
+    def test_invalid_scan_fields(self, client, upstream, body):
+        """Test that malformed scan fields are rejected before scanning."""
+        self._assert_error(client.post("/api/v1/scan", json=body), 400)
+        assert upstream.calls == 0
+    
+    def test_scan_accepts_numeric_filters(self, client):
+        """Test that numeric filter values are normalized, not rejected."""
+        response = client.post("/api/v1/scan", json={
+            "limit": 5, "include_fibonacci": "true", "filters": {"min_volume": 3e6}
+        })
+        
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body["filters_applied"] == {"min_volume": "3000000.0"}
+        assert [coin["symbol"] for coin in body["coins"]] == ["C3", "C4", "C5"]
+
+
+class TestRouteCache:
+    """Test the route-level response cache and conditional requests."""
+    
+    @pytest.mark.parametrize("url", [
+        "/api/v1/coins/C1",
+        "/api/v1/coins/C1/fibonacci",
+        "/api/v1/coins/C1/ath-atl",
+    ])
+    def test_second_request_served_from_route_cache(self, app, client, upstream, url):
+        """Test a repeated GET is replayed without reaching CoinGecko."""
+        first = client.get(url)
+        # Empty the service cache so only the route cache can answer
+        app.extensions["cache_service"].clear()
+        calls = upstream.calls
+        
+        second = client.get(url)
+        
+        assert second.status_code == 200
+        assert second.get_data() == first.get_data()
+        assert upstream.calls == calls
+    
+    def test_not_found_is_not_cached(self, app, client, upstream):
+        """Test that a 404 is not replayed once the coin exists."""
+        assert client.get("/api/v1/coins/C9").status_code == 404
+        
+        upstream.rows.append(_market_row(9))
+        app.extensions["cache_service"].clear()
+        
+        response = client.get("/api/v1/coins/C9")
+        assert response.status_code == 200
+        assert response.get_json()["symbol"] == "C9"
+    
+    def test_not_found_is_json(self, client):
+        """Test that a missing coin returns the standard error body."""
+        response = client.get("/api/v1/coins/NOPE/fibonacci")
+        
+        assert response.status_code == 404
+        assert response.get_json()["error"] == "Coin with symbol 'NOPE' not found"
+    
+    @pytest.mark.parametrize("url", [
+        "/api/v1/coins?limit=3",
+        "/api/v1/coins/C1",
+        "/api/v1/coins/C1/fibonacci",
+    ])
+    def test_matching_etag_returns_not_modified(self, client, url):
+        """Test If-None-Match yields 304, including for replayed responses."""
+        first = client.get(url)
+        etag = first.headers["ETag"]
+        assert first.headers["Cache-Control"].startswith("public, max-age=")
+        
+        # The second request is served from cache, the third is revalidated
+        assert client.get(url).headers["ETag"] == etag
+        not_modified = client.get(url, headers={"If-None-Match": etag})
+        
+        assert not_modified.status_code == 304
+        assert not_modified.get_data() == b""
+        assert client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
@@ -2,21 +2,23 @@
 
 import pytest
 import time
-import sys
-import os
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from app.services.cache_service import CacheService, cached, _make_cache_key
 
-from app.services.cache_service import CacheService
 
-
-@pytest.fixture
+@pytest.fixture(scope="module")
 def cache_service():
-    """Create a cache service instance."""
+    """Create a cache service instance shared by the module."""
     return CacheService(ttl=1, max_size=10)
 
 
+@pytest.fixture(autouse=True)
+def _reset_cache(cache_service):
+    """Give every test an empty cache with zeroed statistics."""
+    cache_service.clear()
+    cache_service._reset_stats()
+
+
 class TestCacheService:
     """Test cases for CacheService."""
     
@@ -40,6 +42,7 @@ class TestCacheService:
         stats = cache_service.get_stats()
         assert stats["misses"] == 1
     
+    @pytest.mark.slow
     def test_ttl_expiration(self, cache_service):
         """Test TTL expiration."""
         cache_service.set("key1", "value1")
@@ -53,6 +56,58 @@ class TestCacheService:
         # Should be expired
         assert cache_service.get("key1") is None
     
+    def test_per_key_ttl(self, cache_service):
+        """Test that a per-key TTL overrides the service default."""
+        cache_service.set("short", "value1", ttl=0)
+        cache_service.set("long", "value2", ttl=60)
+        
+        assert cache_service.get("short") is None
+        assert cache_service.get("long") == "value2"
+    
+    def test_get_with_stale(self, cache_service):
+        """Test that expired entries are still served as stale."""
+        cache_service.set("key1", "value1", ttl=0)
+        
+        assert cache_service.get("key1") is None
+        assert cache_service.get_with_stale("key1") == ("value1", True)
+        assert cache_service.get_with_stale("missing") == (None, False)
+        
+        cache_service.set("key2", "value2", ttl=60)
+        assert cache_service.get_with_stale("key2") == ("value2", False)
+        
+        stats = cache_service.get_stats()
+        assert stats["stale_hits"] == 1
+    
+    def test_stale_window_expires(self):
+        """Test that entries are dropped once the stale window passes."""
+        cache = CacheService(ttl=60, max_size=10, stale_ttl=0)
+        cache.set("key1", "value1", ttl=0)
+        
+        assert cache.get_with_stale("key1") == (None, False)
+        assert cache.get_stats()["size"] == 0
+    
+    def test_memory_expiry_ignores_wall_clock(self, cache_service, monkeypatch):
+        """Test that in-memory TTLs follow the monotonic clock."""
+        cache_service.set("key1", "value1", ttl=60)
+        monkeypatch.setattr(time, "time", lambda: 10**10)
+        
+        assert cache_service.get("key1") == "value1"
+    
+    def test_sweep_reclaims_expired_entries(self):
+        """Test that entries past the stale window are swept periodically."""
+        cache = CacheService(ttl=60, max_size=100, stale_ttl=0)
+        cache.SWEEP_EVERY = 10
+        for i in range(5):
+            cache.set(f"old{i}", i, ttl=0)
+        cache.set("live", "value", ttl=60)
+        assert cache.get_stats()["size"] == 6
+        
+        for _ in range(cache.SWEEP_EVERY):
+            cache.get("live")
+        
+        assert cache.get_stats()["size"] == 1
+        assert cache.get("live") == "value"
+    
     def test_delete(self, cache_service):
         """Test delete operation."""
         cache_service.set("key1", "value1")
@@ -104,3 +159,115 @@ class TestCacheService:
         stats = cache_service.get_stats()
         expected_hit_rate = (2 / 3) * 100
         assert abs(stats["hit_rate"] - expected_hit_rate) < 0.1
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for a redis.Redis client."""
+    
+    def __init__(self):
+        self.store = {}
+    
+    def get(self, key):
+        return self.store.get(key)
+    
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+    
+    def delete(self, *keys):
+        return sum(1 for key in keys if self.store.pop(key, None) is not None)
+    
+    def exists(self, key):
+        return int(key in self.store)
+    
+    def scan_iter(self, match=None):
+        prefix = match.rstrip("*") if match else ""
+        return [key for key in self.store if key.startswith(prefix)]
+    
+    def dbsize(self):
+        return len(self.store)
+    
+    def info(self, section=None):
+        return {"keyspace_hits": 0, "keyspace_misses": 0}
+
+
+class TestRedisCacheService:
+    """Test cases for the Redis-backed CacheService."""
+    
+    @pytest.fixture
+    def redis_cache(self):
+        """Create a cache service backed by a fake Redis client."""
+        cache = CacheService(ttl=60, max_size=10)
+        cache._client = FakeRedis()
+        cache.backend = "redis"
+        return cache
+    
+    def test_round_trip(self, redis_cache):
+        """Test values are pickled into Redis and restored."""
+        redis_cache.set("key1", {"price": 1.5})
+        
+        assert redis_cache.get("key1") == {"price": 1.5}
+        assert redis_cache.has_key("key1")
+        assert "trade-scan:v2:key1" in redis_cache._client.store
+    
+    def test_delete_and_clear(self, redis_cache):
+        """Test delete and clear against Redis."""
+        redis_cache.set("key1", "value1")
+        redis_cache.set("key2", "value2")
+        
+        assert redis_cache.delete("key1") is True
+        assert redis_cache.delete("key1") is False
+        
+        redis_cache.clear()
+        assert redis_cache.get("key2") is None
+        
+        stats = redis_cache.get_stats()
+        assert stats["backend"] == "redis"
+        assert "keyspace_hits" in stats
+    
+    def test_size_not_reported(self, redis_cache):
+        """Test that Redis size is unavailable rather than a keyspace walk."""
+        redis_cache._client.store["ts_view//api/v1/coins/BTC"] = b"route"
+        redis_cache.set("key1", "value1")
+        
+        assert redis_cache.get_stats()["size"] is None
+
+
+class TestCachedDecorator:
+    """Test cases for the cached decorator."""
+    
+    def test_key_is_stable(self):
+        """Test equivalent calls produce the same compact key."""
+        def fetch(symbol, limit=10, order="desc"):
+            pass
+        
+        key1, _ = _make_cache_key(fetch, "p", ("BTC",), {"limit": 5, "order": "asc"})
+        key2, _ = _make_cache_key(fetch, "p", ("BTC",), {"order": "asc", "limit": 5})
+        key3, _ = _make_cache_key(fetch, "p", ("ETH",), {"limit": 5, "order": "asc"})
+        
+        assert key1 == key2
+        assert key1 != key3
+        assert key1.startswith("p:")
+        assert len(key1) == len("p:") + 32
+    
+    def test_caches_result(self, cache_service):
+        """Test decorated methods hit the cache on repeat calls."""
+        class Service:
+            def __init__(self, cache):
+                self.cache_service = cache
+                self.calls = 0
+            
+            @cached(key_prefix="svc", debug=True)
+            def lookup(self, symbol, filters=None):
+                self.calls += 1
+                return symbol.lower()
+        
+        service = Service(cache_service)
+        
+        assert service.lookup("BTC", filters={"min": 1}) == "btc"
+        assert service.lookup("BTC", filters={"min": 1}) == "btc"
+        assert service.calls == 1
+        
+        key, payload = _make_cache_key(
+            Service.lookup.__wrapped__, "svc", ("BTC",), {"filters": {"min": 1}}
+        )
+        assert cache_service.get(f"{key}:payload") == payload
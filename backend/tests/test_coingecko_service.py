@@ -0,0 +1,466 @@
+"""Unit tests for CoinGecko service."""
+
+import pytest
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import httpx
+import orjson
+
+from app.services import coingecko_service
+from app.services.cache_service import CacheService
+from app.services.coingecko_service import (
+    CoinGeckoService,
+    RateLimiter,
+    _build_session,
+    _parse_retry_after
+)
+
+
+class FakeResponse:
+    """Minimal stand-in for httpx.Response."""
+    
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self.content = orjson.dumps(payload)
+        self.text = ""
+        self.headers = headers or {}
+
+
+class FakeSession:
+    """Session returning queued responses and recording calls."""
+    
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+        self.params = []
+    
+    def get(self, url, params=None):
+        self.calls += 1
+        self.params.append(params)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def make_service():
+    """Build a CoinGecko service around a fake session."""
+    def _make(*responses):
+        service = CoinGeckoService(session=FakeSession(*responses))
+        service.rate_limiter = RateLimiter(calls_per_minute=10**6)
+        return service
+    return _make
+
+
+class TestRateLimiter:
+    """Test cases for the token-bucket RateLimiter."""
+    
+    def test_burst_then_pacing(self, monkeypatch):
+        """Test that a full bucket bursts and further calls are paced."""
+        now = [1000.0]
+        sleeps = []
+        monkeypatch.setattr(coingecko_service.time, "monotonic", lambda: now[0])
+        monkeypatch.setattr(coingecko_service.time, "sleep", sleeps.append)
+        
+        limiter = RateLimiter(calls_per_minute=60)
+        capacity = int(limiter.capacity)
+        
+        for _ in range(capacity):
+            limiter.wait_if_needed()
+        assert sleeps == []
+        
+        limiter.wait_if_needed()
+        assert sleeps == [pytest.approx(1 / limiter.rate)]
+    
+    def test_refills_over_time(self, monkeypatch):
+        """Test that idle time refills the bucket."""
+        now = [1000.0]
+        sleeps = []
+        monkeypatch.setattr(coingecko_service.time, "monotonic", lambda: now[0])
+        monkeypatch.setattr(coingecko_service.time, "sleep", sleeps.append)
+        
+        limiter = RateLimiter(calls_per_minute=60)
+        for _ in range(int(limiter.capacity) + 1):
+            limiter.wait_if_needed()
+        sleeps.clear()
+        
+        now[0] += 60
+        limiter.wait_if_needed()
+        assert sleeps == []
+    
+    def test_repeated_throttles_pause_callers(self, monkeypatch):
+        """Test that consecutive 429s trip a full-window pause."""
+        now = [1000.0]
+        sleeps = []
+        monkeypatch.setattr(coingecko_service.time, "monotonic", lambda: now[0])
+        monkeypatch.setattr(coingecko_service.time, "sleep", sleeps.append)
+        
+        limiter = RateLimiter(calls_per_minute=60)
+        for _ in range(limiter.THROTTLE_THRESHOLD - 1):
+            assert limiter.record_throttle() is False
+        limiter.record_success()
+        
+        for _ in range(limiter.THROTTLE_THRESHOLD - 1):
+            assert limiter.record_throttle() is False
+        assert limiter.record_throttle() is True
+        
+        limiter.wait_if_needed()
+        assert sleeps[0] >= 60
+
+
+class TestMakeRequest:
+    """Test cases for CoinGeckoService._make_request."""
+    
+    def test_success_returns_json(self, make_service):
+        """Test that a 200 response returns the decoded body."""
+        service = make_service(FakeResponse(200, [{"id": "bitcoin"}]))
+        
+        assert service._make_request("coins/markets") == [{"id": "bitcoin"}]
+        assert service.session.calls == 1
+    
+    def test_rate_limited_is_retried(self, make_service, monkeypatch):
+        """Test that a 429 is retried, honouring Retry-After."""
+        sleeps = []
+        monkeypatch.setattr(coingecko_service.time, "sleep", sleeps.append)
+        service = make_service(
+            FakeResponse(429, headers={"Retry-After": "2"}),
+            FakeResponse(200, [{"id": "bitcoin"}])
+        )
+        
+        assert service._make_request("coins/markets") == [{"id": "bitcoin"}]
+        assert service.session.calls == 2
+        assert sleeps == [2]
+    
+    def test_retry_after_http_date(self, make_service, monkeypatch):
+        """Test that an HTTP-date Retry-After is honoured."""
+        sleeps = []
+        monkeypatch.setattr(coingecko_service.time, "sleep", sleeps.append)
+        retry_at = format_datetime(
+            datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True
+        )
+        service = make_service(
+            FakeResponse(429, headers={"Retry-After": retry_at}),
+            FakeResponse(200, [{"id": "bitcoin"}])
+        )
+        
+        assert service._make_request("coins/markets") == [{"id": "bitcoin"}]
+        assert 28 <= sleeps[0] <= 30
+    
+    def test_parse_retry_after(self):
+        """Test Retry-After parsing for both header forms."""
+        assert _parse_retry_after("7") == 7.0
+        assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert _parse_retry_after("soon") is None
+        assert _parse_retry_after(None) is None
+    
+    def test_backoff_is_jittered_and_capped(self, make_service, monkeypatch):
+        """Test that backoff delays carry jitter and never exceed the cap."""
+        sleeps = []
+        monkeypatch.setattr(coingecko_service.time, "sleep", sleeps.append)
+        monkeypatch.setattr(coingecko_service, "MAX_BACKOFF", 2.0)
+        service = make_service(*[FakeResponse(503)] * 3, FakeResponse(200, []))
+        
+        assert service._make_request("coins/markets") == []
+        assert 0.5 <= sleeps[0] <= 1.5
+        assert all(delay <= 2.0 for delay in sleeps)
+    
+    def test_gives_up_after_retry_budget(self, make_service, monkeypatch):
+        """Test that persistent 5xx responses stop after MAX_RETRIES."""
+        monkeypatch.setattr(coingecko_service.time, "sleep", lambda _: None)
+        retries = coingecko_service.MAX_RETRIES
+        service = make_service(*[FakeResponse(503)] * (retries + 1))
+        
+        assert service._make_request("coins/markets") is None
+        assert service.session.calls == retries + 1
+    
+    def test_client_error_is_not_retried(self, make_service):
+        """Test that non-retryable statuses fail immediately."""
+        service = make_service(FakeResponse(404))
+        
+        assert service._make_request("coins/unknown") is None
+        assert service.session.calls == 1
+    
+    def test_concurrent_identical_requests_are_coalesced(self, make_service):
+        """Test that identical in-flight requests share one HTTP call."""
+        service = make_service(FakeResponse(200, [{"id": "bitcoin"}]))
+        release = threading.Event()
+        fetch = service.session.get
+        
+        def slow_get(url, params=None):
+            release.wait(5)
+            return fetch(url, params)
+        
+        service.session.get = slow_get
+        params = {"ids": "bitcoin", "vs_currency": "usd"}
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(service._make_request("coins/markets", params))
+            )
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        
+        assert results == [[{"id": "bitcoin"}]] * 4
+        assert service.session.calls == 1
+    
+    def test_stuck_leader_times_out(self, make_service, monkeypatch):
+        """Test that followers fetch directly when the leader never finishes."""
+        monkeypatch.setattr(coingecko_service, "COALESCE_TIMEOUT", 0.01)
+        service = make_service(FakeResponse(200, [{"id": "bitcoin"}]))
+        service._inflight[("coins/markets", frozenset())] = (
+            coingecko_service._InflightRequest()
+        )
+        
+        assert service._make_request("coins/markets") == [{"id": "bitcoin"}]
+        assert service.session.calls == 1
+    
+    def test_connection_error_returns_none(self, make_service):
+        """Test that transport errors degrade to None."""
+        service = make_service(httpx.ConnectError("down"))
+        
+        assert service._make_request("coins/markets") is None
+        assert service.session.calls == 1
+    
+    def test_invalid_json_returns_none(self, make_service):
+        """Test that a 200 with a truncated body degrades to None."""
+        response = FakeResponse(200)
+        response.content = b'[{"id": "bitc'
+        service = make_service(response)
+        
+        assert service._make_request("coins/markets") is None
+    
+    def test_shared_client_configuration(self):
+        """Test that the shared client carries timeouts and default headers."""
+        client = _build_session()
+        
+        assert client.timeout.connect == 3.0
+        assert client.headers["Accept"] == "application/json"
+        client.close()
+    
+    def test_services_share_one_client(self, monkeypatch):
+        """Test that services default to one lazily created client per process."""
+        monkeypatch.setattr(coingecko_service, "_session", None)
+        
+        first = CoinGeckoService().session
+        try:
+            assert CoinGeckoService().session is first
+            
+            # A forked child must build its own client
+            coingecko_service._reset_shared_session()
+            second = CoinGeckoService().session
+            assert second is not first
+            second.close()
+        finally:
+            first.close()
+    
+    def test_concurrent_refresh_starts_one_thread(self, make_service, monkeypatch):
+        """Test that simultaneous first requests start a single refresher."""
+        class SlowStartThread(threading.Thread):
+            """Widens the window between creating and starting a thread."""
+            
+            def start(self):
+                time.sleep(0.01)
+                super().start()
+        
+        monkeypatch.setattr(coingecko_service.threading, "Thread", SlowStartThread)
+        service = make_service()
+        service.warm_ath_atl_cache = lambda: 0
+        start = threading.Barrier(8)
+        
+        def first_request():
+            start.wait()
+            service.start_background_refresh(interval=3600)
+        
+        threads = [threading.Thread(target=first_request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        
+        try:
+            refreshers = [
+                thread for thread in threading.enumerate()
+                if thread.name == "ath-atl-refresh"
+            ]
+            assert refreshers == [service._refresh_thread]
+        finally:
+            service.stop_background_refresh()
+            service._refresh_thread.join(5)
+    
+    def test_fork_resets_coalescing_state(self, make_service, monkeypatch):
+        """Test that a child never waits on requests owned by the parent."""
+        monkeypatch.setattr(coingecko_service, "_session", None)
+        service = make_service(FakeResponse(200, [{"id": "bitcoin"}]))
+        
+        # State a parent thread left behind mid-request at fork time
+        key = ("coins/markets", frozenset())
+        service._inflight[key] = coingecko_service._InflightRequest()
+        service._inflight_lock.acquire()
+        service.rate_limiter._lock.acquire()
+        
+        coingecko_service._after_fork_in_child()
+        
+        assert service._inflight == {}
+        assert service._make_request("coins/markets") == [{"id": "bitcoin"}]
+
+
+def _market_row(coin_id, rank):
+    """Build a coins/markets row for a fake coin."""
+    return {
+        "id": coin_id,
+        "symbol": coin_id[:3],
+        "name": coin_id.title(),
+        "current_price": 10.0,
+        "price_change_percentage_24h": 1.5,
+        "market_cap_rank": rank,
+        "ath": 100.0,
+        "ath_date": "2021-11-10T14:24:11.849Z",
+        "atl": 1.0,
+        "atl_date": "2015-10-20T00:00:00.000Z"
+    }
+
+
+class TestMarketsBulk:
+    """Test cases for CoinGeckoService.get_markets_bulk."""
+    
+    def test_chunks_ids_into_pages(self, make_service):
+        """Test that ids are requested MARKETS_PAGE_SIZE at a time."""
+        service = make_service(
+            FakeResponse(200, [_market_row("alpha", 1), _market_row("beta", 2)]),
+            FakeResponse(200, [_market_row("gamma", 3)])
+        )
+        service.MARKETS_PAGE_SIZE = 2
+        
+        markets = service.get_markets_bulk(["alpha", "beta", "gamma"])
+        
+        assert service.session.calls == 2
+        assert list(markets) == ["alpha", "beta", "gamma"]
+        assert markets["alpha"].ath == 100.0
+        assert markets["alpha"].atl_date is not None
+    
+    def test_serves_cached_coins_without_request(self, make_service):
+        """Test that coins already cached are not fetched again."""
+        service = make_service(FakeResponse(200, [_market_row("alpha", 1)]))
+        service.cache_service = CacheService(ttl=60, max_size=10)
+        
+        service.get_markets_bulk(["alpha"])
+        markets = service.get_markets_bulk(["alpha"])
+        
+        assert service.session.calls == 1
+        assert "alpha" in markets
+
+
+class TestMarketsBySymbols:
+    """Test cases for CoinGeckoService.get_markets_by_symbols."""
+    
+    def test_pages_past_duplicate_tickers(self, make_service):
+        """Test that coins sharing a ticker cannot crowd out other symbols."""
+        service = make_service(
+            FakeResponse(200, [_market_row("bitcoin", 1), _market_row("bitcoin-clone", 3)]),
+            FakeResponse(200, [_market_row("ethereum-lite", 500)])
+        )
+        service.MARKETS_PAGE_SIZE = 2
+        
+        markets = service.get_markets_by_symbols(["BIT", "eth"])
+        
+        assert service.session.calls == 2
+        assert [p["page"] for p in service.session.params] == [1, 2]
+        assert markets["BIT"].name == "Bitcoin"
+        assert markets["ETH"].name == "Ethereum-Lite"
+    
+    def test_caches_per_symbol(self, make_service):
+        """Test that a cached symbol is reused in a differently composed batch."""
+        service = make_service(
+            FakeResponse(200, [_market_row("bitcoin", 1)]),
+            FakeResponse(200, [_market_row("ethereum", 2)])
+        )
+        service.cache_service = CacheService(ttl=60, max_size=10)
+        
+        service.get_markets_by_symbols(["BIT"])
+        markets = service.get_markets_by_symbols(["BIT", "ETH"])
+        
+        assert service.session.params[1]["symbols"] == "eth"
+        assert set(markets) == {"BIT", "ETH"}
+    
+    def test_unknown_symbol_is_absent(self, make_service):
+        """Test that a short empty page ends the lookup without a match."""
+        service = make_service(FakeResponse(200, []))
+        
+        assert service.get_markets_by_symbols(["NOPE"]) == {}
+        assert service.session.calls == 1
+
+
+class TestSymbolMap:
+    """Test cases for CoinGeckoService.get_symbol_to_id_map."""
+    
+    def test_highest_ranked_symbol_wins_and_is_cached(self, make_service):
+        """Test that duplicate symbols keep the top coin and the map is cached."""
+        rows = [_market_row("bitcoin", 1), _market_row("bitcoin-clone", 900)]
+        service = make_service(FakeResponse(200, rows))
+        service.cache_service = CacheService(ttl=60, max_size=10)
+        
+        assert service.get_symbol_to_id_map(limit=2) == {"BIT": "bitcoin"}
+        assert service.get_symbol_to_id_map(limit=2) == {"BIT": "bitcoin"}
+        assert service.session.calls == 1
+    
+    def test_refreshing_top_coins_drops_symbol_map(self, make_service):
+        """Test that a top coins refresh invalidates the derived map."""
+        service = make_service(
+            FakeResponse(200, [_market_row("alpha", 1)]),
+            FakeResponse(200, [_market_row("beta", 1)])
+        )
+        service.cache_service = CacheService(ttl=60, max_size=10)
+        
+        assert service.get_symbol_to_id_map(limit=1) == {"ALP": "alpha"}
+        service.get_top_coins(limit=1, use_cache=False)
+        assert service.get_symbol_to_id_map(limit=1) == {"BET": "beta"}
+
+
+class TestStaleFallback:
+    """Test cases for serving stale cache entries on failed refreshes."""
+    
+    def test_market_data_served_stale_on_failure(self, make_service, monkeypatch):
+        """Test that an expired market entry is returned when the API fails."""
+        service = make_service(
+            FakeResponse(200, [_market_row("alpha", 1)]),
+            FakeResponse(503)
+        )
+        service.cache_service = CacheService(ttl=60, max_size=10)
+        service.MARKET_DATA_TTL = 0
+        
+        fresh = service.get_coin_market_data("alpha")
+        
+        # No retry budget, so the refresh fails on the first 503
+        monkeypatch.setattr(coingecko_service, "MAX_RETRIES", 0)
+        stale = service.get_coin_market_data("alpha")
+        
+        assert service.session.calls == 2
+        assert stale == fresh
+
+
+class TestAthAtlPrefetch:
+    """Test cases for CoinGeckoService.warm_ath_atl_cache."""
+    
+    def test_hydrates_per_coin_entries(self, make_service):
+        """Test that one markets call fills ath_atl: and market_data: keys."""
+        service = make_service(
+            FakeResponse(200, [_market_row("alpha", 1), _market_row("beta", 2)])
+        )
+        service.cache_service = CacheService(ttl=60, max_size=10)
+        
+        assert service.warm_ath_atl_cache(limit=2) == 2
+        
+        ath_atl = service.get_coin_ath_atl("beta")
+        assert ath_atl.ath == 100.0
+        assert ath_atl.atl_date is not None
+        assert "alpha" in service.get_markets_bulk(["alpha"])
+        assert service.session.calls == 1
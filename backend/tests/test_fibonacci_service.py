@@ -1,54 +1,79 @@
 """Unit tests for Fibonacci service."""
 
 import pytest
-import sys
-import os
-
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from pydantic import ValidationError
 
 from app.services.fibonacci_service import FibonacciService
-from app.models import ATHATLData
+from app.services._fib_kernels import (
+    _make_fib_all_codegen,
+    RETRACEMENT_SLICE,
+    EXTENSION_SLICE,
+    POSITION_INDEX
+)
+from app.models import ATHATLData, CoinMarketData
+
+
+# Ratio constants in the form FibonacciService passes to its kernel
+KERNEL_TERMS = (
+    [t[0] for t in FibonacciService._RETRACEMENT_TERMS],
+    [t[1] for t in FibonacciService._RETRACEMENT_TERMS],
+    [t[1] for t in FibonacciService._EXTENSION_TERMS]
+)
 
 
-@pytest.fixture
+def _assert_kernel_matches(service, fib_all_fixed, current, ath=69000.0, atl=67.81):
+    """Check a fib_all kernel against the service's level calculators."""
+    values = fib_all_fixed(ath, atl, current)
+    
+    retracements = service.calculate_retracement_levels(ath, atl)
+    extensions = service.calculate_extension_levels(ath, atl)
+    
+    assert values[RETRACEMENT_SLICE] == [level.price for level in retracements]
+    assert values[EXTENSION_SLICE] == [level.price for level in extensions]
+    assert round(values[POSITION_INDEX], 2) == (
+        service.calculate_position_percentage(current, ath, atl)
+    )
+
+
+@pytest.fixture(scope="session")
 def fibonacci_service():
-    """Create a Fibonacci service instance."""
+    """Create a Fibonacci service instance (stateless, so shared)."""
     return FibonacciService()
 
 
+# (ath, atl, retracement count, extension count, expected 50% price)
+LEVEL_CASES = [
+    (69000.0, 67.81, 7, 4, 34533.905),
+    (100.0, 1.0, 7, 4, 50.5),
+    (4878.26, 0.43, 7, 4, 2439.345),
+]
+
+
 class TestFibonacciService:
     """Test cases for FibonacciService."""
     
-    def test_calculate_retracement_levels(self, fibonacci_service):
-        """Test Fibonacci retracement level calculation."""
-        ath = 69000.0
-        atl = 67.81
+    @pytest.mark.parametrize("ath, atl, n_retracements, n_extensions, expected_50", LEVEL_CASES)
+    def test_calculate_levels(
+        self, fibonacci_service, ath, atl, n_retracements, n_extensions, expected_50
+    ):
+        """Test Fibonacci retracement and extension level calculation."""
+        retracements = fibonacci_service.calculate_retracement_levels(ath, atl)
+        extensions = fibonacci_service.calculate_extension_levels(ath, atl)
         
-        levels = fibonacci_service.calculate_retracement_levels(ath, atl)
-        
-        assert len(levels) == 7
-        assert levels[0].level == 0.0
-        assert levels[0].price == ath
-        assert levels[-1].level == 1.0
-        assert levels[-1].price == atl
+        assert len(retracements) == n_retracements
+        assert retracements[0].level == 0.0
+        assert retracements[0].price == ath
+        assert retracements[-1].level == 1.0
+        assert retracements[-1].price == atl
         
         # Check 50% level
-        fib_50 = next(l for l in levels if l.level == 0.5)
-        expected_50 = ath - ((ath - atl) * 0.5)
+        fib_50 = next(l for l in retracements if l.level == 0.5)
         assert abs(fib_50.price - expected_50) < 0.01
-    
-    def test_calculate_extension_levels(self, fibonacci_service):
-        """Test Fibonacci extension level calculation."""
-        ath = 69000.0
-        atl = 67.81
         
-        levels = fibonacci_service.calculate_extension_levels(ath, atl)
-        
-        assert len(levels) == 4
-        assert all(l.price > ath for l in levels)
-        assert levels[0].level == 1.272
-        assert levels[-1].level == 4.236
+        assert len(extensions) == n_extensions
+        assert all(l.price > ath for l in extensions)
+        assert extensions[0].level == 1.272
+        assert extensions[-1].level == 4.236
     
     def test_calculate_position_percentage(self, fibonacci_service):
         """Test position percentage calculation."""
@@ -85,6 +110,82 @@ class TestFibonacciService:
         assert len(analysis.extension_levels) == 4
         assert 0 <= analysis.position_percentage <= 100
     
+    def test_find_nearest_levels(self, fibonacci_service):
+        """Test nearest support/resistance inside and above the range."""
+        retracements = fibonacci_service.calculate_retracement_levels(100.0, 1.0)
+        extensions = fibonacci_service.calculate_extension_levels(100.0, 1.0)
+        
+        # Between the 50% (50.5) and 38.2% (62.182) levels
+        support, resistance = fibonacci_service.find_nearest_levels(
+            55.0, retracements, extensions
+        )
+        assert support.label == "50%"
+        assert resistance.label == "38.2%"
+        
+        # Above ATH: support comes from the extension levels
+        support, resistance = fibonacci_service.find_nearest_levels(
+            150.0, retracements, extensions
+        )
+        assert support.label == "127.2%"
+        assert resistance.label == "161.8%"
+        
+        # Exactly at ATH: the level itself is neither support nor resistance
+        support, resistance = fibonacci_service.find_nearest_levels(
+            100.0, retracements, extensions
+        )
+        assert support.label == "23.6%"
+        assert resistance.label == "127.2%"
+    
+    def test_analyze_batch_matches_analyze(self, fibonacci_service):
+        """Test that batch analysis equals per-coin analysis."""
+        coins = [
+            CoinMarketData(symbol="BTC", name="Bitcoin", current_price=43500.0,
+                           price_change_24h=0, ath=69000.0, atl=67.81),
+            CoinMarketData(symbol="ETH", name="Ethereum", current_price=9000.0,
+                           price_change_24h=0, ath=4878.26, atl=0.43),
+            CoinMarketData(symbol="NEW", name="New", current_price=1.0,
+                           price_change_24h=0, ath=None, atl=None),
+        ]
+        
+        analyses = fibonacci_service.analyze_batch(coins)
+        
+        for coin, analysis in zip(coins[:2], analyses):
+            expected = fibonacci_service.analyze(coin.symbol, ATHATLData(
+                ath=coin.ath, atl=coin.atl, current_price=coin.current_price
+            ))
+            assert analysis == expected
+        assert analyses[2] is None
+        assert fibonacci_service.analyze_batch([]) == []
+    
+    def test_kernel_matches_level_calculators(self, fibonacci_service):
+        """Test that the service's fib_all agrees with the level calculators."""
+        _assert_kernel_matches(fibonacci_service, fibonacci_service._fib_all, 100000.0)
+    
+    @pytest.mark.parametrize("current", [1.0, 67.81, 20000.0, 69000.0, 90000.0])
+    def test_codegen_kernel_matches_calculators(self, fibonacci_service, current):
+        """Test the constant-folded kernel used when numba is missing."""
+        _assert_kernel_matches(
+            fibonacci_service, _make_fib_all_codegen(*KERNEL_TERMS), current
+        )
+    
+    @pytest.mark.parametrize("current", [1.0, 67.81, 20000.0, 69000.0, 90000.0])
+    def test_jit_kernel_matches_calculators(self, fibonacci_service, current):
+        """Test the numba kernel whenever numba is installed."""
+        pytest.importorskip("numba")
+        from app.services._fib_kernels import _make_fib_all_jit
+        
+        _assert_kernel_matches(
+            fibonacci_service, _make_fib_all_jit(*KERNEL_TERMS), current
+        )
+    
+    def test_levels_are_immutable(self, fibonacci_service):
+        """Test that levels cannot be mutated once built."""
+        level = fibonacci_service.calculate_retracement_levels(100.0, 1.0)[0]
+        
+        with pytest.raises(ValidationError):
+            level.price = 1.0
+        assert hash(level) == hash(level.model_copy())
+    
     def test_invalid_ath_atl(self, fibonacci_service):
         """Test error handling for invalid ATH/ATL."""
         with pytest.raises(ValueError):
@@ -93,11 +194,21 @@ class TestFibonacciService:
         with pytest.raises(ValueError):
             fibonacci_service.calculate_retracement_levels(-100.0, 50.0)
     
-    def test_asian_range_fib(self, fibonacci_service):
-        """Test Asian Range 50% Fibonacci calculation."""
-        body_high = 44000.0
-        body_low = 43000.0
+    def test_ath_atl_data_validates_range(self):
+        """Test the range analyze relies on is enforced by ATHATLData."""
+        with pytest.raises(ValidationError):
+            ATHATLData(ath=100.0, atl=200.0, current_price=150.0)
         
+        data = ATHATLData(ath=200.0, atl=100.0, current_price=150.0)
+        with pytest.raises(ValidationError):
+            data.atl = 300.0
+    
+    @pytest.mark.parametrize("body_high, body_low", [
+        (44000.0, 43000.0),
+        (1.25, 0.75),
+    ])
+    def test_asian_range_fib(self, fibonacci_service, body_high, body_low):
+        """Test Asian Range 50% Fibonacci calculation."""
         fib_50 = fibonacci_service.calculate_asian_range_fib(body_high, body_low)
         
         expected = (body_high + body_low) / 2
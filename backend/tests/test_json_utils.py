@@ -0,0 +1,72 @@
+"""Unit tests for JSON response helpers."""
+
+import pytest
+import orjson
+from flask import Flask
+
+from app.models import FibonacciLevel
+from app.utils.json import json_response
+
+
+@pytest.fixture
+def app():
+    """Create a bare Flask app for request contexts."""
+    return Flask(__name__)
+
+
+class TestJsonResponse:
+    """Test cases for json_response."""
+    
+    def test_serializes_models(self, app):
+        """Test Pydantic models are serialized directly."""
+        level = FibonacciLevel(level=0.5, price=100.0, label="50%", type="retracement")
+        
+        with app.test_request_context("/"):
+            response = json_response({"levels": [level]})
+        
+        assert response.status_code == 200
+        assert response.mimetype == "application/json"
+        assert orjson.loads(response.get_data()) == {
+            "levels": [{"level": 0.5, "price": 100.0, "label": "50%", "type": "retracement"}]
+        }
+        assert "ETag" not in response.headers
+    
+    def test_conditional_not_modified(self, app):
+        """Test a matching If-None-Match short-circuits to 304."""
+        with app.test_request_context("/"):
+            response = json_response({"a": 1}, conditional=True)
+        
+        etag = response.headers["ETag"]
+        assert response.headers["Cache-Control"].startswith("public, max-age=")
+        
+        with app.test_request_context("/", headers={"If-None-Match": etag}):
+            not_modified = json_response({"a": 1}, conditional=True)
+        
+        assert not_modified.status_code == 304
+        assert not_modified.get_data() == b""
+        assert not_modified.headers["ETag"] == etag
+        
+        with app.test_request_context("/", headers={"If-None-Match": etag}):
+            changed = json_response({"a": 2}, conditional=True)
+        
+        assert changed.status_code == 200
+
+
+class TestORJSONProvider:
+    """Test cases for the Flask JSON provider."""
+    
+    def test_jsonify_and_get_json_use_orjson(self):
+        """Test jsonify encodes models and request JSON round-trips."""
+        from flask import jsonify, request
+        from app.utils.json import ORJSONProvider
+        
+        app = Flask(__name__)
+        app.json = ORJSONProvider(app)
+        level = FibonacciLevel(level=0.5, price=100.0, label="50%", type="retracement")
+        
+        with app.test_request_context("/", method="POST", json={"symbols": ["BTC"]}):
+            assert request.get_json() == {"symbols": ["BTC"]}
+            response = jsonify(level)
+        
+        assert response.mimetype == "application/json"
+        assert orjson.loads(response.get_data())["label"] == "50%"
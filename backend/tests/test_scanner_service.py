@@ -0,0 +1,151 @@
+"""Unit tests for Scanner service."""
+
+import pytest
+
+from app.models import ATHATLData, CoinInfo, CoinMarketData
+from app.services.fibonacci_service import FibonacciService
+from app.services.scanner_service import ScannerService
+
+
+def _coin(symbol, change, volume=None, market_cap=None, with_fib=False):
+    """Build a coin, optionally with Fibonacci analysis attached."""
+    coin = CoinMarketData(
+        symbol=symbol,
+        name=symbol.title(),
+        current_price=50.0,
+        price_change_24h=change,
+        volume_24h=volume,
+        market_cap=market_cap,
+        ath=100.0,
+        atl=1.0
+    )
+    if with_fib:
+        coin.fibonacci_analysis = FibonacciService().analyze(
+            symbol,
+            ATHATLData(ath=coin.ath, atl=coin.atl, current_price=coin.current_price)
+        )
+    return coin
+
+
+class FakeCoinGecko:
+    """CoinGecko stand-in serving a fixed ranked coin list."""
+    
+    def __init__(self, coins):
+        self.coins = coins
+    
+    def get_top_coins(self, limit=100):
+        return [
+            CoinInfo(id=c.symbol.lower(), symbol=c.symbol, name=c.name)
+            for c in self.coins[:limit]
+        ]
+    
+    def get_markets_bulk(self, coin_ids, use_cache=True):
+        return {c.symbol.lower(): c for c in self.coins if c.symbol.lower() in coin_ids}
+    
+    def get_coin_market_data(self, coin_id, use_cache=True):
+        return self.get_markets_bulk([coin_id]).get(coin_id)
+    
+    def get_coin_ath_atl(self, coin_id, use_cache=True):
+        raise AssertionError("scan path must not call coins/{id}")
+
+
+@pytest.fixture
+def scanner_service():
+    """Create a scanner service instance."""
+    return ScannerService(
+        coingecko_service=None,
+        fibonacci_service=FibonacciService()
+    )
+
+
+class TestApplyFilters:
+    """Test cases for ScannerService._apply_filters."""
+    
+    def test_combined_filters(self, scanner_service):
+        """Test that all clauses are applied together."""
+        coins = [
+            _coin("AAA", 2.0, volume=5e6, market_cap=1e9),
+            _coin("BBB", 9.0, volume=5e6, market_cap=1e9),
+            _coin("CCC", 2.0, volume=1e3, market_cap=1e9),
+            _coin("DDD", -1.0, volume=5e6, market_cap=1e5),
+        ]
+        
+        filtered = scanner_service._apply_filters(coins, {
+            "min_volume": "1000000",
+            "min_market_cap": "1000000",
+            "min_change_24h": "-5",
+            "max_change_24h": "5"
+        })
+        
+        assert [c.symbol for c in filtered] == ["AAA"]
+    
+    def test_missing_values_fail_explicit_minimums(self, scanner_service):
+        """Test that coins without volume are dropped only when filtered on."""
+        coins = [_coin("AAA", 0.0), _coin("BBB", 0.0, volume=10.0)]
+        
+        assert len(scanner_service._apply_filters(coins, {"max_change_24h": 1})) == 2
+        
+        filtered = scanner_service._apply_filters(coins, {"min_volume": 0})
+        assert [c.symbol for c in filtered] == ["BBB"]
+    
+    def test_fib_position_requires_analysis(self, scanner_service):
+        """Test that Fibonacci position filters skip coins without analysis."""
+        coins = [_coin("AAA", 0.0), _coin("BBB", 0.0, with_fib=True)]
+        
+        filtered = scanner_service._apply_filters(coins, {"max_fib_position": 100})
+        
+        assert [c.symbol for c in filtered] == ["BBB"]
+
+
+class TestScanTopCoins:
+    """Test cases for ScannerService.scan_top_coins."""
+    
+    def test_preserves_market_cap_order(self):
+        """Test that results keep the ranked order of the top coins list."""
+        coins = [
+            _coin("AAA", 1.0, volume=5e6),
+            _coin("BBB", 1.0, volume=1e3),
+            _coin("CCC", 1.0, volume=5e6),
+        ]
+        service = ScannerService(
+            coingecko_service=FakeCoinGecko(coins),
+            fibonacci_service=FibonacciService()
+        )
+        
+        result = service.scan_top_coins(
+            limit=3,
+            include_fibonacci=False,
+            filters={"min_volume": "1000000"}
+        )
+        
+        assert [c.symbol for c in result.coins] == ["AAA", "CCC"]
+
+
+class TestScanCoin:
+    """Test cases for ScannerService.scan_coin."""
+    
+    def test_fibonacci_uses_market_row_without_dates(self):
+        """Test that Fibonacci analysis never needs the coins/{id} call."""
+        service = ScannerService(
+            coingecko_service=FakeCoinGecko([_coin("AAA", 1.0)]),
+            fibonacci_service=FibonacciService()
+        )
+        
+        coin = service.scan_coin("aaa")
+        
+        assert coin.fibonacci_analysis is not None
+        assert coin.fibonacci_analysis.ath == 100.0
+    
+    def test_flat_range_skips_fibonacci(self):
+        """Test that a coin with ATH == ATL is returned without analysis."""
+        coin = _coin("AAA", 0.0)
+        coin.ath = coin.atl = coin.current_price
+        service = ScannerService(
+            coingecko_service=FakeCoinGecko([coin]),
+            fibonacci_service=FibonacciService()
+        )
+        
+        scanned = service.scan_coin("aaa")
+        
+        assert scanned is not None
+        assert scanned.fibonacci_analysis is None
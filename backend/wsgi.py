@@ -0,0 +1,15 @@
+"""
+WSGI entry point for production servers.
+
+Run with gunicorn threaded workers, e.g.:
+
+    gunicorn -k gthread --threads 16 --workers 4 --preload \
+        -b 0.0.0.0:5000 wsgi:app
+
+``--preload`` builds the app (services, shared HTTP session and cache)
+once in the master process before workers are forked.
+"""
+
+from app import create_app
+
+app = create_app()